@@ -0,0 +1,40 @@
+"""
+ Measure the memory used per Config, Schema and ConfigLevel object when many of
+ them are alive at once.
+
+ Usage (from the repository root, with configmng installed or on the PYTHONPATH):
+
+     python benchmarks/bench_config_memory.py [n_objects]
+"""
+import gc
+import sys
+import tracemalloc
+
+from configmng import Config, Schema
+from configmng.configlevel import ConfigLevel
+
+
+def measure(factory, n_objects):
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [factory(no) for no in range(n_objects)]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objects
+    return size / n_objects
+
+
+def main(n_objects=100000):
+    schema = Schema({"type": "map", "mapping": {"job": {"type": "int"}}})
+    factories = {"Config": lambda no: Config({"job": no}),
+                 "Config with schema": lambda no: Config({"job": no}, schemas=schema),
+                 "Schema": lambda no: Schema({"type": "map", "mapping": {"job": {"type": "int"}}}),
+                 "ConfigLevel": lambda no: ConfigLevel("level_{}".format(no))}
+    for name, factory in factories.items():
+        print("{:<20} {:>10.0f} bytes/object ({} objects)"
+              .format(name, measure(factory, n_objects), n_objects))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
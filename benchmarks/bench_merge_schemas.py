@@ -0,0 +1,48 @@
+"""
+ Measure the throughput of Schema.merge_schemas on synthetic schemas.
+
+ Usage (from the repository root, with configmng installed or on the PYTHONPATH):
+
+     python benchmarks/bench_merge_schemas.py [n_keys] [n_schemas] [n_repeats]
+"""
+import sys
+import time
+
+from configmng import Schema
+
+
+def make_schema_data(n_keys, no):
+    mapping = {}
+    for key_no in range(n_keys):
+        mapping["key_{}".format(key_no)] = {"type": "str",
+                                            "required": bool(key_no % 2),
+                                            "pattern": "value_{}_.*".format(no),
+                                            "desc": "Key {} of schema {}".format(key_no, no)}
+    return {"name": "schema_{}".format(no), "type": "map",
+            "mapping": {"section_{}".format(section): {"type": "map", "mapping": mapping}
+                        for section in range(10)}}
+
+
+def count_nodes(data):
+    if isinstance(data, dict):
+        return len(data) + sum(count_nodes(value) for value in data.values())
+    return 0
+
+
+def main(n_keys=1000, n_schemas=4, n_repeats=5):
+    schemas = [Schema(make_schema_data(n_keys, no)) for no in range(n_schemas)]
+    n_nodes = sum(count_nodes(schema.load()) for schema in schemas)
+
+    durations = []
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        Schema.merge_schemas(schemas)
+        durations.append(time.perf_counter() - start)
+
+    best = min(durations)
+    print("Merged {} schemas ({} nodes) in {:.3f} s (best of {}): {:.0f} nodes/s"
+          .format(n_schemas, n_nodes, best, n_repeats, n_nodes / best))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -3,3 +3,4 @@ from .configmng import ConfigMng
 from .configlevel import ConfigLevel
 from .schema import Schema
 from .provenance import ConfigProv
+from .numeric import NumericSequence
@@ -0,0 +1,125 @@
+from collections.abc import Mapping
+from pathlib import Path
+import os
+import pickle
+import tempfile
+import time
+import typing
+
+from .utils import content_hash
+
+
+# Bundles written with another format version cannot be loaded.
+BUNDLE_FORMAT_VERSION = 1
+
+
+def _source_stat(path: Path):
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def key_provenance_tree(tree: dict, data: Mapping, origin):
+    """
+     Record origin for every leaf of data in the nested dict tree, following the
+     same overshadowing rules as utils.update.
+    """
+    for key, value in data.items():
+        if isinstance(value, Mapping) and len(value):
+            if not isinstance(tree.get(key), dict):
+                tree[key] = {}
+            key_provenance_tree(tree[key], value, origin)
+        elif isinstance(value, Mapping) and isinstance(tree.get(key), dict):
+            continue
+        else:
+            tree[key] = origin
+
+
+def flatten_tree(tree: dict, path=()):
+    flat = {}
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            flat.update(flatten_tree(value, path + (key,)))
+        else:
+            flat[path + (key,)] = value
+    return flat
+
+
+class ConfigBundle:
+    """
+     Self-contained snapshot of a validated ConfigMng: merged store, merged
+     schema, per-key provenance, and a certificate binding them to the inputs
+     they were built from. Bundles are pickled; only load bundles that you trust.
+    """
+
+    def __init__(self, store: dict, schema_data: typing.Optional[dict],
+                 provenance: typing.Dict[tuple, tuple], certificate: dict):
+        self.store = store
+        self.schema_data = schema_data
+        self.provenance = provenance
+        self.certificate = certificate
+
+    @staticmethod
+    def from_config_mng(config_mng) -> "ConfigBundle":
+        # The certificate is only issued for a configuration that validates.
+        config_mng.validate(interactive=False)
+        merged_config = config_mng.config
+
+        schema_data = None
+        if len(merged_config.schemas):
+            schema_data = merged_config.merged_schema().load(copy=False)
+
+        sources = set()
+        for config in config_mng.get_configs():
+            # Not through the path property, which creates temporary files for
+            # the configurations that have not been read from a file.
+            if config._path is not None and config._tmp_file is None:
+                sources.add(config.path.resolve())
+            for schema in config.schemas:
+                if schema._path is not None:
+                    sources.add(schema._path.resolve())
+        for level_name in config_mng.level_order:
+            for schema in config_mng.get_level(level_name).get_schemas():
+                if schema._path is not None:
+                    sources.add(schema._path.resolve())
+
+        certificate = {"format_version": BUNDLE_FORMAT_VERSION,
+                       "created": time.time(),
+                       "inputs_key": config_mng._cache_key(),
+                       "store_hash": merged_config.fingerprint(),
+                       "schema_hash": None if schema_data is None else content_hash(schema_data),
+                       "sources": {str(path): _source_stat(path) for path in sorted(sources)}}
+
+        return ConfigBundle(merged_config.store, schema_data,
+                            config_mng.key_provenance(), certificate)
+
+    def save(self, path):
+        # Written to a temporary file first so that readers never see a partial bundle.
+        path = Path(path)
+        with tempfile.NamedTemporaryFile("wb", dir=str(path.parent), prefix=".tmp_bundle_",
+                                         delete=False) as stream:
+            pickle.dump(self, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(stream.name, str(path))
+
+    @staticmethod
+    def load(path) -> "ConfigBundle":
+        with Path(path).open("rb") as stream:
+            bundle = pickle.load(stream)
+        if not isinstance(bundle, ConfigBundle) or \
+                bundle.certificate.get("format_version") != BUNDLE_FORMAT_VERSION:
+            raise ValueError("{} is not a configuration bundle compatible with this ".format(path) +
+                             "version of configmng. Compile it again.")
+        return bundle
+
+    def stale_sources(self) -> typing.List[Path]:
+        """
+         Return the source files that changed (by modification time or size)
+         or disappeared since the bundle was compiled.
+        """
+        return [Path(path) for path, stat in self.certificate["sources"].items()
+                if _source_stat(Path(path)) != stat]
+
+    def is_stale(self) -> bool:
+        return len(self.stale_sources()) > 0
@@ -0,0 +1,99 @@
+from pathlib import Path
+import os
+import pickle
+import sqlite3
+import time
+import typing
+
+from .utils import content_hash
+
+
+# Stored results are ignored if they were written with another format version.
+CACHE_FORMAT_VERSION = 1
+
+
+class ConfigCache:
+    """
+     On-disk cache of validated merged configurations, stored in a SQLite
+     database. Entries are keyed by a hash of everything the merged
+     configuration depends on (see ConfigMng._cache_key) and hold the merged
+     store. The database uses WAL journaling so that many processes (e.g.,
+     SLURM tasks) can read it while others write to it.
+
+     Stores are pickled; only use cache files that you trust.
+    """
+
+    def __init__(self, path: typing.Union[str, Path], timeout: float = 30.0):
+        """
+        :param path: Path of the SQLite database. It is created if it does not exist.
+        :param timeout: Number of seconds to wait for a lock held by another writer.
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._connection: typing.Optional[sqlite3.Connection] = None
+        self._pid = None
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections cannot be shared with forked processes.
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(str(self.path), timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS merged_configs ("
+                               "key TEXT PRIMARY KEY, "
+                               "store BLOB NOT NULL, "
+                               "created REAL NOT NULL)")
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def make_key(components) -> str:
+        return content_hash([CACHE_FORMAT_VERSION, components])
+
+    def get(self, key: str) -> typing.Optional[dict]:
+        row = self._connect().execute("SELECT store FROM merged_configs WHERE key = ?",
+                                      (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, key: str, store: dict):
+        # Concurrent writers of the same key write the same store, so the last
+        # one can simply replace the others.
+        self._connect().execute("INSERT OR REPLACE INTO merged_configs (key, store, created) "
+                                "VALUES (?, ?, ?)",
+                                (key, pickle.dumps(store, protocol=pickle.HIGHEST_PROTOCOL), time.time()))
+        self.writes += 1
+
+    def clear(self):
+        self._connect().execute("DELETE FROM merged_configs")
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM merged_configs").fetchone()[0]
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self)}
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_pid"] = None
+        return state
@@ -1,14 +1,14 @@
 from pathlib import Path
-from collections.abc import MutableMapping
+from collections.abc import Mapping, MutableMapping
+from contextlib import contextmanager
 from tempfile import NamedTemporaryFile
 from warnings import warn
-from pykwalify.core import Core
 from pykwalify.errors import SchemaError
+from copy import deepcopy
 import typing
 from typing import List
 import os
 import json
-import re
 
 import yaml
 try:
@@ -17,24 +17,39 @@ except ImportError:
     from yaml import Loader, Dumper
 
 from .schema import Schema
-from .utils import ConfigMngLoader, update, get_node
-from .provenance import ConfigProv
+from .utils import ConfigMngDumper, load_yaml, update, check_regex_key, leaf_paths
+from .utils import as_keys, get_path, parse_path
+from .provenance import ConfigProv, source_label
+from .numeric import NumericSequence, compact_sequences
+from .validation import ConfigCore, validate_paths
+from .fingerprint import FingerprintCache
+from .references import ReferenceResolver
+from .transaction import Transaction
+from .frozen import thaw_child, thaw_path, is_frozen, node_hash
+from .interning import InternPool, default_pool
+from .filelock import locked_file, DEFAULT_LOCK_TIMEOUT
+from .utils import content_hash
+from .diff import ConfigDiff, diff_stores
+from .subscriptions import Subscription, SubscriptionTrie, ANY_PATH
+from .query import QueryIndex, QueryResult
+from .journal import ChangeJournal, JournalRecord, MISSING, update_changes
 
 
-def check_regex_key(map, key):
-    if key in map:
-        return map[key]
+_missing = object()
 
-    for map_key in map:
-        if "regex" in map_key:
-            regex = map_key.split(";")[1]
-            pattern = re.compile(regex)
-            if pattern.match(key):
-                return map[map_key]
 
-    raise TypeError
+def _hashes(data) -> FingerprintCache:
+    # Node hashes of data, all computed.
+    hashes = FingerprintCache()
+    hashes.fingerprint(data)
+    return hashes
 
 
+def json_default(obj):
+    if isinstance(obj, NumericSequence):
+        return obj.tolist()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(obj).__name__))
+
 
 def get_schema_node(schema, path, key):
     obj_to_return = schema
@@ -54,17 +69,51 @@ def get_schema_key_type(schema, key, path):
 
 class Config(MutableMapping):
 
+    # Many configurations can be alive at once (e.g., one per job), so they
+    # are slotted and their optional members (fingerprint cache, provenance,
+    # temporary file) are only created when needed.
+    __slots__ = ("_frozen", "_interned", "_fingerprints", "_resolver", "_transaction", "_dirty_paths",
+                 "_store", "temp_dir_node", "delete_tmp_files", "_path", "_tmp_file",
+                 "_schemas", "_insertion_node", "_provenance", "read_only", "compact_numeric",
+                 "_saved_hashes", "_unsaved_paths", "_subscriptions", "_query_index",
+                 "__weakref__")
+
     def __init__(self, config=None, schemas=None, temp_dir_node=("paths", "log_dir"),
-                 delete_tmp_files=False, insertion_node=None, read_only=False):
+                 delete_tmp_files=False, insertion_node=None, read_only=False,
+                 compact_numeric=False, validate=True, frozen=False):
+        """
+        :param compact_numeric: If true, long lists of integers or floats are stored
+                                as read-only NumPy-backed NumericSequence objects.
+        :param validate: If false, the configuration is not validated on construction.
+        :param frozen: If true, the configuration is frozen after construction (see freeze).
+        """
+        self._frozen = False
+        # Whether the store has been interned with intern (rather than holding
+        # frozen subtrees merged from frozen configurations).
+        self._interned = False
+        self._fingerprints: typing.Optional[FingerprintCache] = None
+        self._resolver: typing.Optional[ReferenceResolver] = None
+        self._transaction: typing.Optional[Transaction] = None
+        # Paths of the nodes modified since the last validation; () stands
+        # for the whole configuration.
+        self._dirty_paths: typing.Set[tuple] = {()}
+        # Node hashes of the file at self.path when it was last loaded or saved,
+        # and paths of the nodes modified since then (None if not tracked).
+        self._saved_hashes: typing.Optional[FingerprintCache] = None
+        self._unsaved_paths: typing.Optional[typing.Set[tuple]] = None
+        self._subscriptions: typing.Optional[SubscriptionTrie] = None
+        self._query_index: typing.Optional[QueryIndex] = None
         self.store: dict = dict()
         self.temp_dir_node = temp_dir_node
         self.delete_tmp_files = delete_tmp_files
-        self.path = None
+        self._path: typing.Optional[Path] = None
         self._tmp_file = None
-        self._schemas: List[Schema] = []
+        # Schemas, keyed by fingerprint so that duplicates are detected in O(1).
+        self._schemas: typing.Dict[str, Schema] = {}
         self._insertion_node = ()
-        self._provenance = ConfigProv()
+        self._provenance: typing.Optional[ConfigProv] = None
         self.read_only = read_only
+        self.compact_numeric = compact_numeric
 
         if schemas is not None:
             self.set_schemas(schemas)
@@ -73,27 +122,320 @@ class Config(MutableMapping):
         if insertion_node is not None:
             self._insertion_node = insertion_node
 
-        self.validate()
+        if validate:
+            self.validate()
+        if frozen:
+            self.freeze()
 
     def __del__(self):
         if self.delete_tmp_files and self._tmp_file is not None:
             os.remove(self._tmp_file.name)
 
     def __iadd__(self, other):
+        self._check_mutable()
         merged_config = self._merge_configs_([self, other])
+        old_store = self.store
         self.store = merged_config.store
-        self._schemas = merged_config.schemas
+        self._replaced(old_store)
+        self._schemas = merged_config._schemas
         self._insertion_node = merged_config._insertion_node
-        self._provenance = merged_config.provenance
+        self.provenance.merging([other])
         return self
 
     def __add__(self, other):
         return self._merge_configs_([self, other])
 
     @property
-    def provenance(self):
+    def store(self) -> dict:
+        return self._store
+
+    @store.setter
+    def store(self, store: dict):
+        self._store = store
+        self._interned = False
+        self._fingerprints = None
+        self._resolver = None
+        self._dirty_paths = {()}
+        if self._unsaved_paths is not None:
+            self._unsaved_paths.add(())
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def _check_mutable(self):
+        if self._frozen:
+            raise TypeError("This configuration is frozen and cannot be modified. Create a "
+                            "new configuration from it (e.g., Config(config)) to modify it.")
+
+    def freeze(self, pool: typing.Optional[InternPool] = None):
+        """
+         Make this configuration immutable and hashable. Its store is replaced by
+         an interned frozen tree (see intern), so that merging this configuration
+         into others or reading it requires no defensive copy.
+        """
+        if not self._frozen:
+            if pool is None:
+                pool = default_pool
+            self._replace_store(pool.intern(self.store))
+            self._frozen = True
+
+    def __hash__(self):
+        if not self._frozen:
+            raise TypeError("unhashable type: 'Config'. Only frozen configurations are hashable.")
+        # Consistent with __eq__, unlike fingerprint (which distinguishes 1 from 1.0).
+        return node_hash(self.store)
+
+    def _changed(self, path: typing.Sequence):
+        # Called after the node at path has been modified in place.
+        if self._fingerprints is not None:
+            self._fingerprints.invalidate(path)
+        if self._resolver is not None:
+            self._resolver.invalidate(path)
+        self._dirty_paths.add(tuple(path))
+        if self._unsaved_paths is not None:
+            self._unsaved_paths.add(tuple(path))
+        if self._subscriptions is not None:
+            self._subscriptions.dispatch(self, [path])
+
+    def _updated(self, update_mapping: typing.Mapping):
+        # Called after the store has been recursively updated with update_mapping.
+        if self._fingerprints is not None:
+            self._fingerprints.invalidate_update(update_mapping)
+        paths = list(leaf_paths(update_mapping))
+        for path in paths:
+            if self._resolver is not None:
+                self._resolver.invalidate(path)
+            self._dirty_paths.add(path)
+            if self._unsaved_paths is not None:
+                self._unsaved_paths.add(path)
+        if self._subscriptions is not None and paths:
+            self._subscriptions.dispatch(self, paths)
+
+    def _replaced(self, old_store: dict):
+        # Called after the store has been replaced by one with a different content.
+        if self._subscriptions is not None:
+            self._subscriptions.dispatch(self, diff_stores(old_store, self.store).paths)
+
+    def subscribe(self, path_pattern, callback: typing.Callable, all_paths: bool = False) -> Subscription:
+        """
+         Call callback(config, path) whenever a node matching path_pattern is modified
+         through __setitem__, update, set_value_at_path, a merge (+=), or a reload
+         from the file when saving, path being the modified path. Patterns are key
+         paths such as "paths/root", where * matches any key and a trailing ** any
+         path. Subscribers to a node are notified of modifications of its descendants
+         and ancestors. The returned Subscription is cancelled with its cancel method.
+
+        :param all_paths: If true, callback is called with the list of all the modified
+                          paths matching path_pattern instead of the first one.
+        """
+        if self._subscriptions is None:
+            self._subscriptions = SubscriptionTrie()
+        return self._subscriptions.add(path_pattern, callback, all_paths)
+
+    def mark_changed(self, path: typing.Sequence = ()):
+        """
+         Report that the node at path has been modified in place, other than
+         through __setitem__, update, or set_value_at_path (e.g., with
+         config["a"]["b"] = value).
+        """
+        self._check_mutable()
+        self._changed(path)
+
+    @property
+    def changed_paths(self) -> typing.List[tuple]:
+        """
+         Paths of the nodes modified since the last validation, excluding the
+         paths under another modified node.
+        """
+        paths = []
+        kept = set()
+        for path in sorted(self._dirty_paths, key=len):
+            if not any(path[:no] in kept for no in range(len(path))):
+                kept.add(path)
+                paths.append(path)
+        return paths
+
+    def fingerprint(self, path: typing.Sequence = ()) -> str:
+        """
+         Stable hash of the content of the node at path (of the whole configuration
+         by default). Node hashes are cached and only the ones along a modified
+         path are recomputed after calls to __setitem__, update, or set_value_at_path.
+         Other in-place modifications of nested mappings must be reported with
+         invalidate_fingerprint.
+        """
+        if self._fingerprints is None:
+            self._fingerprints = FingerprintCache()
+        return self._fingerprints.fingerprint(self.store, path)
+
+    def diff(self, other: "Config") -> ConfigDiff:
+        """
+         Return the key paths added, removed, or changed from this configuration
+         to other. Subtrees shared by both configurations or frozen in both (e.g.,
+         interned) with equal content hashes are not visited. Cached fingerprints
+         are not used since they do not see the nested mappings modified in place.
+        """
+        other_store = other.store if isinstance(other, Config) else other
+        return diff_stores(self.store, other_store)
+
+    def invalidate_fingerprint(self, path: typing.Sequence = ()):
+        if self._fingerprints is not None:
+            self._fingerprints.invalidate(path)
+
+    @contextmanager
+    def transaction(self, validate: bool = True, save: bool = False, interactive: bool = False):
+        """
+         Context manager buffering the mutations made in its block. Calls to update
+         do not validate the configuration and fixes made by manage_error are not
+         saved. On exit, the configuration is validated once if it has been
+         modified, checking only the modified nodes. If validation (or the block) raises an exception, the modified
+         nodes are restored to their values from before the transaction.
+         Nested transactions are merged with the outermost one.
+
+        :param validate: If true, the configuration is validated on exit.
+        :param save: If true, the configuration is saved (once) on exit.
+        :param interactive: Passed to validate.
+        """
+        if self._transaction is not None:
+            yield self
+            return
+
+        transaction = self._transaction = Transaction()
+        try:
+            yield self
+            if validate and transaction.touched:
+                self.revalidate(interactive=interactive)
+        except BaseException:
+            self._transaction = None
+            if self._provenance is not None:
+                for path, previous in reversed(transaction.undo):
+                    self._provenance.journal.record(path, self._get_at(path), previous, "rollback")
+            for path in transaction.rollback(self.store):
+                self._changed(path)
+            raise
+        self._transaction = None
+        if save or transaction.save_pending:
+            self.save()
+
+    def intern(self, pool: typing.Optional[InternPool] = None):
+        """
+         Replace the subtrees of this configuration by frozen subtrees shared, through
+         pool (the process-wide interning.default_pool by default), with all the
+         configurations holding identical subtrees. Shared nodes cannot be modified
+         in place; __setitem__, update, and set_value_at_path copy them on write.
+        """
+        if self._frozen:
+            return
+        if pool is None:
+            pool = default_pool
+        self._replace_store({key: pool.intern(value) for key, value in self.store.items()})
+        self._interned = True
+
+    def _replace_store(self, store: dict):
+        # Replace the store by one with the same content (e.g., interned).
+        dirty_paths = self._dirty_paths
+        unsaved_paths = self._unsaved_paths
+        self.store = store
+        self._dirty_paths = dirty_paths
+        self._unsaved_paths = unsaved_paths
+
+    def query(self, pattern: str, insertion_node: bool = False) -> typing.List[QueryResult]:
+        """
+         Return the values whose key path matches pattern as QueryResult objects,
+         sorted by path. Pattern keys can be literal keys, glob patterns (e.g.,
+         "*/log_dir"), "regex;" followed by a regular expression (e.g.,
+         "regex;subject_.*"), or ** to match any number of keys. The key paths of
+         the configuration are indexed on the first query and reindexed
+         incrementally when the configuration is modified.
+
+        :param insertion_node: If true, the paths (both matched and returned) are
+                               prefixed with the insertion node of the configuration.
+        """
+        if self._query_index is None:
+            index = self._query_index = QueryIndex()
+
+            def reindex(config, paths):
+                for path in paths:
+                    index.update(config.store, path)
+
+            self.subscribe(ANY_PATH, reindex, all_paths=True)
+
+        prefix = tuple(self.insertion_node) if insertion_node else ()
+        store = self.store
+        source = source_label(self)
+        return [QueryResult(prefix + path, get_path(store, path), source=source)
+                for path in self._query_index.query(store, pattern, prefix)]
+
+    def resolve(self, path: typing.Sequence = ()):
+        """
+         Return the value at path (the whole configuration by default) with its
+         ${...} references (e.g., "${paths.root}/logs") resolved. References are
+         evaluated once and memoized; modifying the configuration through
+         __setitem__, update, or set_value_at_path only invalidates the values
+         depending on the modified node.
+        """
+        if self._resolver is None:
+            self._resolver = ReferenceResolver(self.store)
+        return self._resolver.resolve(path)
+
+    @property
+    def provenance(self) -> ConfigProv:
+        if self._provenance is None:
+            self._provenance = ConfigProv()
         return self._provenance
 
+    @property
+    def journal(self) -> ChangeJournal:
+        """
+         Journal of the modifications of this configuration (see ChangeJournal).
+         Modifications are journaled once the configuration has a provenance, i.e.,
+         for merged configurations or once this property has been accessed.
+        """
+        return self.provenance.journal
+
+    def _get_at(self, path: typing.Sequence):
+        node = self.store
+        try:
+            for key in path:
+                node = node[key]
+        except (KeyError, IndexError, TypeError):
+            return MISSING
+        return node
+
+    def _journal_change(self, path: typing.Sequence, new, source: typing.Optional[str] = None):
+        # Called before the node at path is set to new (MISSING if deleted).
+        if self._provenance is not None:
+            self._provenance.journal.record(path, self._get_at(path), new, source)
+
+    def undo(self, steps: int = 1) -> typing.List[JournalRecord]:
+        """
+         Revert the last steps journaled modifications and return their records.
+         Once compacted (see ChangeJournal.compact), the modifications of a path
+         are reverted together.
+        """
+        self._check_mutable()
+        undone = []
+        if self._provenance is None:
+            return undone
+        for _ in range(steps):
+            record = self._provenance.journal.pop()
+            if record is None:
+                break
+            path = record.path
+            if self._transaction is not None:
+                self._transaction.record(self.store, path)
+            try:
+                parent = thaw_path(self.store, path[:-1])
+            except (KeyError, IndexError, TypeError):
+                continue
+            if record.old is MISSING:
+                parent.pop(path[-1], None)
+            else:
+                parent[path[-1]] = record.old
+            self._changed(path)
+            undone.append(record)
+        return undone
+
     @property
     def insertion_node(self):
         return self._insertion_node
@@ -111,17 +453,17 @@ class Config(MutableMapping):
                 for key in config.insertion_node[:-1]:
                     if key not in store or store[key] is None:
                         store[key] = {}
-                    store = store[key]
+                    store = thaw_child(store, key)
                 key = config.insertion_node[-1]
 
                 if key not in store:
                     store[key] = {}
                 if isinstance(store[key], MutableMapping):
-                    update(store[key], config)
+                    update(thaw_child(store, key), config)
                 else:
-                    store[key] = config.store.copy()
+                    store[key] = config.store if config.frozen else config.store.copy()
             else:
-                update(store, config.store.copy())
+                update(store, config.store if config.frozen else config.store.copy())
             return_config.add_schemas(config.schemas)
         return_config.provenance.merging(configs)
         return return_config
@@ -137,35 +479,39 @@ class Config(MutableMapping):
         if isinstance(schemas, list):
             for schema in schemas:
                 schema = _check_schema_type_(schema)
-                if schema not in self._schemas:
-                    self._schemas.append(schema)
+                self._schemas.setdefault(schema.fingerprint, schema)
         else:
             schema = _check_schema_type_(schemas)
-            if schema not in self._schemas:
-                self._schemas.append(schema)
+            self._schemas.setdefault(schema.fingerprint, schema)
+        self._dirty_paths = {()}
 
     def set_schemas(self, schemas):
-        self._schemas = []
+        self._schemas = {}
         self.add_schemas(schemas)
+        self._dirty_paths = {()}
 
     def set_config(self, config, schemas=None, validate=True):
+        saved_state = None
+        provenance = None
 
         if isinstance(config, (str, Path)):
             self.path = Path(config)
-            with Path(config).open('r') as check_stream:
-                config = yaml.load(check_stream, Loader=ConfigMngLoader)
-                if config is None:
-                    return
+            config = load_yaml(config)
+            if config is None:
+                return
+            saved_state = (_hashes(config), None)
 
         elif isinstance(config, Config):
-            self.path = config.path
+            self._path = config._path
             self.temp_dir_node = config.temp_dir_node
             self.delete_tmp_files = config.delete_tmp_files
             self._tmp_file = config._tmp_file
-            self._schemas = config.schemas
+            self._schemas = dict(config._schemas)
             self._insertion_node = config._insertion_node
-            self._provenance = config.provenance
             self.read_only = config.read_only
+            self.compact_numeric = config.compact_numeric
+            provenance = config._provenance
+            saved_state = (config._saved_hashes, config._unsaved_paths)
 
         elif isinstance(config, dict):
             self.path = None
@@ -177,15 +523,29 @@ class Config(MutableMapping):
         if schemas is not None:
             self.set_schemas(schemas)
 
+        if self.compact_numeric:
+            config = compact_sequences(config)
+
         self.update(config, validate=validate)
 
+        if provenance is not None:
+            # Set after the update so that the copied content is not journaled.
+            self._provenance = provenance.copy()
+        if saved_state is not None:
+            self._saved_hashes = saved_state[0]
+            self._unsaved_paths = set() if saved_state[1] is None else set(saved_state[1])
+
     @property
     def path(self) -> Path:
+        # Configurations not read from a file get a temporary file the first
+        # time their path is needed.
+        if self._path is None:
+            self._path = self.get_temporary_path()
         return self._path
 
     def get_temporary_path(self):
         dir_ = None
-        store = self.store.copy()
+        store = self.store if self.frozen else self.store.copy()
         for key in self.temp_dir_node:
             if key in store:
                 store = store[key]
@@ -209,7 +569,8 @@ class Config(MutableMapping):
     @path.setter
     def path(self, path: Path):
         if path is None:
-            self._path = self.get_temporary_path()
+            self._path = None
+            return
         elif isinstance(path, str):
             self._path = Path(path)
         elif isinstance(path, Path):
@@ -220,28 +581,52 @@ class Config(MutableMapping):
             raise FileNotFoundError("The configuration file {} was not found.".format(self._path))
 
     @property
-    def schemas(self):
-        return self._schemas
+    def schemas(self) -> List[Schema]:
+        return list(self._schemas.values())
 
     @schemas.setter
     def schemas(self, schemas):
-        self._schemas = schemas
+        self.set_schemas(list(schemas))
+
+    def merged_schema(self) -> Schema:
+        # kwalify supports using many schemas, where one is the main schema
+        # and the other are partial schemas inserted in the main one. This
+        # is not our use case; we have union of complete schema. Therefore,
+        # we first merge ourselves our schemas.
+        return Schema.merge_schemas(self.schemas)
+
+    def revalidate(self, raise_exception=True, interactive=True):
+        """
+         Validate the configuration, assuming it was valid when last validated,
+         by checking only the nodes modified since then (see changed_paths) and
+         the constraints of their ancestors on their children (e.g., required
+         keys). Falls back on validate if errors are found, to report or fix them,
+         or if the schemas cannot be checked this way.
+        """
+        if not self._dirty_paths:
+            return
+        if not len(self.schemas):
+            self._dirty_paths.clear()
+            return
+        errors = validate_paths(self.store, self.merged_schema().load(copy=False), self.changed_paths)
+        if errors is None or len(errors):
+            self.validate(raise_exception, interactive)
+        else:
+            self._dirty_paths.clear()
 
     def validate(self, raise_exception=True, interactive=True):
-        if len(self.schemas):
-            if not self.path.exists():
-                self.save()
-
-            # kwalify supports using many schemas, where one is the main schema
-            # and the other are partial schemas inserted in the main one. This
-            # is not our use case; we have union of complete schema. Therefore,
-            # we first merge ourselves our schemas.
-            schema = Schema.merge_schemas(self.schemas)
+        if not len(self.schemas):
+            self._dirty_paths.clear()
+        else:
+            schema = self.merged_schema()
             try:
-                core = Core(source_file=str(self.path),
-                            source_data={},
-                            schema_file_obj=schema.schema_io)
+                # The in-memory store is validated rather than the file at
+                # self.path. Homogeneous numeric sequences are checked as
+                # whole arrays by ConfigCore rather than item by item.
+                core = ConfigCore(source_data=self.store,
+                                  schema_data=schema.load(copy=False))
                 core.validate(raise_exception=raise_exception)
+                self._dirty_paths.clear()
             except SchemaError:
                 if interactive:
                     for error in core.errors:
@@ -257,28 +642,32 @@ class Config(MutableMapping):
                           "or the default configuration files should be corrected. " +
                           "Faulty config file: {}".format(self.path))
                     print("Config file {}:".format(str(self.path)))
-                    with self.path.open("r") as f:
-                        print(f.read())
+                    print(self.pretty_config())
                     print("Schema files:")
                     for schema in self.schemas:
-                        with schema.path.open("r") as f:
-                            print(f.read())
+                        schema.pretty_print()
                     raise
             except:
                 print("Unmanaged error while validating a configuration file. Faulty config file: {}".format(self.path))
                 print("Config file {}:".format(str(self.path)))
-                with self.path.open("r") as f:
-                    print(f.read())
+                print(self.pretty_config())
                 print("Schema files:")
                 for schema in self.schemas:
-                    with schema.path.open("r") as f:
-                        print(f.read())
+                    schema.pretty_print()
                 raise
 
     def set_value_at_path(self, value, key, path, silent_fail=False, only_if_key_in=False):
-        self.provenance.propagate_changes(value, key, path)
+        self._check_mutable()
+        if isinstance(path, str):
+            path = parse_path(path)
+        if self._provenance is not None:
+            self._provenance.propagate_changes(value, key, path, owner=self)
         try:
-            store = get_node(self.store, path)
+            store = thaw_path(self.store, path)
+            if key in store or not only_if_key_in:
+                if self._transaction is not None:
+                    self._transaction.record(self.store, list(path) + [key])
+                self._journal_change(list(path) + [key], value)
             if only_if_key_in:
                 if key in store:
                     store[key] = value
@@ -287,11 +676,29 @@ class Config(MutableMapping):
                         raise KeyError
             else:
                 store[key] = value
+            self._changed(list(path) + [key])
         except KeyError:
             if silent_fail:
                 return
             raise
 
+    def _split_error_path(self, error_path):
+        # Split a pykwalify error path (e.g., '/level1/level2/3') into the key
+        # of the faulty value and the path of its parent node. Sequence indices
+        # are returned as integers and a NumericSequence parent is replaced by
+        # a list so that the value can be modified.
+        keys = error_path.split("/")[1:]
+        node = self.store
+        for no, key in enumerate(keys[:-1]):
+            if isinstance(node, (list, NumericSequence)):
+                keys[no] = key = int(key)
+            if isinstance(node[key], NumericSequence):
+                node[key] = node[key].tolist()
+            node = thaw_child(node, key)
+        if isinstance(node, list):
+            keys[-1] = int(keys[-1])
+        return keys[-1], keys[:-1]
+
     def manage_error(self, core, error: SchemaError.SchemaErrorEntry):
 
         if "Cannot find required key" in error.msg:
@@ -301,43 +708,121 @@ class Config(MutableMapping):
                 value = input("The key {} at path {} of the ".format(error.key, error.path) +
                               "configuration file {} is missing.".format(self.path) +
                               " Please provide a value.")
-            self.set_value_at_path(value, error.key, error.path.split("/")[1:])
+            self.set_value_at_path(value, error.key, parse_path(error.path))
 
         elif "does not match pattern" in error.msg:
             value = input("The value {} for the configuration key {}".format(error.value, error.path) +
                           " is not compatible with the pattern {}.".format(error.pattern) +
                           " required by the schema. Please provide a compatible value.")
-            key = error.path.split("/")[-1]
-            path = "/".join(error.path.split("/")[:-1])
-            self.set_value_at_path(value, key, error.path.split("/")[1:])
+            key, path = self._split_error_path(error.path)
+            self.set_value_at_path(value, key, path)
 
         elif "is not of type" in error.msg:
             value = input("The type for value {} for the configuration key {}".format(error.value, error.path) +
                           " is not compatible with the type {}.".format(error.scalar_type) +
                           " required by the schema. Please provide a compatible value.")
 
-            key = error.path.split("/")[-1]
-            path = "/".join(error.path.split("/")[:-1])
-            self.set_value_at_path(value, key, error.path.split("/")[1:])
+            key, path = self._split_error_path(error.path)
+            self.set_value_at_path(value, key, path)
         else:
             raise
-        self.save()
+        if self._transaction is not None:
+            self._transaction.save_pending = True
+        else:
+            self.save()
 
     def __getitem__(self, key):
         try:
-            return self.store[key]
+            value = self.store[key]
         except KeyError:
             err_msg = "Key '{}' not found in this configuration.\n".format(key)
             # err_msg += "Configuration:\n {}\n".format(self.pretty_config())
             # err_msg += "Schemas:\n {}".format(self.schemas)
             print(err_msg)
             raise
+        # Frozen nodes merged from frozen configurations are copied (shallowly) when
+        # reached, so that config[key][child] = value works; deeper nodes are still
+        # shared and copied on write by set and set_value_at_path.
+        if is_frozen(value) and not self._frozen and not self._interned:
+            value = thaw_child(self.store, key)
+        return value
+
+    def __eq__(self, other):
+        # Compares the stores directly, without going through __getitem__.
+        if isinstance(other, Config):
+            return self.store == other.store
+        if isinstance(other, MutableMapping) or hasattr(other, "items"):
+            return self.store == dict(other.items())
+        return NotImplemented
+
+    def get(self, path, default=None):
+        """
+         Return the value at path, given as a "/"-separated string (e.g.,
+         "paths/log_dir"; parsed strings are cached) or a sequence of keys, or
+         default if it is missing.
+        """
+        return get_path(self.store, as_keys(path), default)
+
+    def get_many(self, paths: typing.Iterable, default=None) -> list:
+        """
+         Return the values at paths (see get), in order. Intended for reading many
+         settings at once, e.g., in a loop over jobs.
+        """
+        store = self.store
+        return [get_path(store, as_keys(path), default) for path in paths]
+
+    def set(self, path, value):
+        """
+         Set the value at path (see get) through set_value_at_path, creating the
+         missing intermediate mappings. Existing nodes are never replaced by
+         mappings: digit keys index the sequences along path, and a TypeError is
+         raised if path goes through a scalar.
+        """
+        keys = list(as_keys(path))
+        if not keys:
+            raise ValueError("The path of the value to set cannot be empty.")
+        node = self.store
+        for no, key in enumerate(keys):
+            if isinstance(node, (list, NumericSequence)) and isinstance(key, str) and key.isdigit():
+                keys[no] = key = int(key)
+            elif not isinstance(node, Mapping):
+                raise TypeError("Cannot set {!r}: {!r} is not a mapping or a sequence."
+                                .format(path, "/".join(map(str, keys[:no]))))
+            if no == len(keys) - 1:
+                break
+            if isinstance(node, Mapping) and key not in node:
+                # Only the missing nodes are created.
+                for missing in reversed(keys[no + 1:]):
+                    value = {missing: value}
+                break
+            node = node[key]
+
+        if isinstance(node, NumericSequence):
+            # Compact sequences are immutable and replaced by lists, as in _split_error_path.
+            values = node.tolist()
+            values[keys[-1]] = value
+            self.set_value_at_path(values, keys[-2], keys[:-2])
+            return
+        if isinstance(node, list):
+            # Raises an IndexError before anything is journaled.
+            node[keys[no]]
+        self.set_value_at_path(value, keys[no], keys[:no])
 
     def __setitem__(self, key, value):
+        self._check_mutable()
+        if self._transaction is not None:
+            self._transaction.record(self.store, [key])
+        self._journal_change([key], value)
         self.store[key] = value
+        self._changed([key])
 
     def __delitem__(self, key):
+        self._check_mutable()
+        if self._transaction is not None:
+            self._transaction.record(self.store, [key])
+        self._journal_change([key], MISSING)
         del self.store[key]
+        self._changed([key])
 
     def __iter__(self):
         return iter(self.store)
@@ -352,15 +837,15 @@ class Config(MutableMapping):
         return str(self.to_json())
 
     def __str__(self):
-        return json.dumps(self.to_json(), indent=4, sort_keys=True)
+        return json.dumps(self.to_json(), indent=4, sort_keys=True, default=json_default)
 
     def to_json(self):
-        return {"config_path": str(self._path),
-                "schema_paths": [str(schema.path) for schema in self._schemas],
+        return {"config_path": str(self.path),
+                "schema_paths": [str(schema.path) for schema in self.schemas],
                 "config_dict": self.store}
 
     def pretty_config(self):
-        return yaml.dump(self.store, default_flow_style=False, default_style='')
+        return yaml.dump(self.store, default_flow_style=False, default_style='', Dumper=ConfigMngDumper)
 
     def pretty_print(self):
         print(self.pretty_config())
@@ -371,23 +856,122 @@ class Config(MutableMapping):
                             "needs an argument")
         if len(args) > 1:
             raise TypeError('update expected at most 1 arguments, got {}'.format(len(args)))
+        self._check_mutable()
+        if self._transaction is not None:
+            validate = False
+            for update_mapping in args + (kwargs,):
+                self._transaction.record_update(self.store, update_mapping)
+        if self._provenance is not None:
+            for update_mapping in args + (kwargs,):
+                for path, old, new in update_changes(self.store, update_mapping):
+                    self._provenance.journal.record(path, old, new)
         if args:
             update(self.store, args[0])
+            self._updated(args[0])
         update(self.store, kwargs)
+        self._updated(kwargs)
 
         if validate:
             self.validate()
 
-    def save(self, path=None):
+    def save(self, path=None, timeout: float = DEFAULT_LOCK_TIMEOUT):
+        """
+         Save the configuration to path (self.path by default). Concurrent writers
+         (e.g., processes saving the same user configuration) are coordinated with
+         an advisory lock on the file, held for at most timeout seconds (see
+         filelock.locked_file). The file is not written if its content is already
+         equal to the configuration. If another writer modified the file since
+         this configuration was loaded or saved, the nodes modified in this
+         configuration since then are merged into the file content, which then
+         becomes the content of this configuration; if nodes have been modified
+         in place (e.g., with config["a"]["b"] = value), the file is overwritten.
+        """
         if path is None:
             if self.read_only:
                 raise PermissionError("This configuration is in read-only mode. To save it, "
                                       "provide a path where to save a copy.")
         else:
+            if self._path is None or Path(path) != self._path:
+                self._saved_hashes = None
+                self._unsaved_paths = set()
             self.path = path
 
-        with self.path.open("w") as stream:
-            yaml.dump(self.store, stream, Dumper=Dumper)
+        with locked_file(self.path, timeout):
+            on_disk = load_yaml(self.path)
+            disk_hash = content_hash(on_disk)
+            # Hashed from the store rather than with fingerprint, which does not
+            # see the nested mappings modified in place (e.g., config["a"]["b"] = 1).
+            hashes = _hashes(self.store)
+            if disk_hash != hashes.fingerprint(self.store):
+                if self._saved_hashes is not None and disk_hash != self._saved_hashes.root.hash \
+                        and isinstance(on_disk, dict) and not self._frozen \
+                        and self._merge_into(on_disk, hashes):
+                    hashes = _hashes(self.store)
+                self._write(self.path)
+            self._saved_hashes = hashes
+            self._unsaved_paths = None if self._frozen else set()
+
+    def _untracked_changes(self, hashes: FingerprintCache) -> bool:
+        # Whether nodes have been modified since the last load or save other than at
+        # the tracked paths (e.g., in place, with config["a"]["b"] = 1). hashes are
+        # the current node hashes of the store.
+        unsaved_paths = self._unsaved_paths
+        ancestors = {path[:no] for path in unsaved_paths for no in range(len(path))}
+
+        def _changed(data, saved, path):
+            if path in unsaved_paths:
+                return False
+            if path not in ancestors:
+                return saved is None or hashes.fingerprint(self.store, path) != saved.hash
+            if not isinstance(data, Mapping) or saved is not None and \
+                    any(key not in data and path + (key,) not in unsaved_paths for key in saved.children):
+                return True
+            return any(_changed(value, None if saved is None else saved.children.get(key), path + (key,))
+                       for key, value in data.items())
+
+        return _changed(self.store, self._saved_hashes.root, ())
+
+    def _merge_into(self, on_disk: dict, hashes: FingerprintCache) -> bool:
+        # Apply the nodes modified since the last load or save onto the content
+        # written to the file by another writer, and adopt the result. Nothing is
+        # merged (and the whole store is written) if the modified nodes are not known.
+        if self._unsaved_paths is None or () in self._unsaved_paths or self._untracked_changes(hashes):
+            return False
+        for path in sorted(self._unsaved_paths, key=len):
+            node = self.store
+            try:
+                for key in path:
+                    node = node[key]
+            except (KeyError, IndexError, TypeError):
+                node = _missing
+            parent = on_disk
+            for key in path[:-1]:
+                if not isinstance(parent.get(key), dict):
+                    parent[key] = {}
+                parent = parent[key]
+            if node is _missing:
+                parent.pop(path[-1], None)
+            else:
+                parent[path[-1]] = deepcopy(node)
+        dirty_paths = self._dirty_paths | {()}
+        old_store = self.store
+        self.store = compact_sequences(on_disk) if self.compact_numeric else on_disk
+        self._dirty_paths = dirty_paths
+        self._replaced(old_store)
+        return True
+
+    def _write(self, path: Path):
+        # The configuration is written to a temporary file which then replaces
+        # the target, so that readers never see a partially written file.
+        with NamedTemporaryFile("w", dir=str(path.parent), prefix=".tmp_save_",
+                                suffix=".yaml", delete=False) as stream:
+            yaml.dump(self.store, stream, Dumper=ConfigMngDumper)
+        try:
+            os.chmod(stream.name, path.stat().st_mode & 0o7777)
+            os.replace(stream.name, str(path))
+        except BaseException:
+            os.remove(stream.name)
+            raise
 
 
 ScalarConfigArg = typing.TypeVar('ScalarConfigArg', MutableMapping, str, Path, Config)
@@ -1,19 +1,54 @@
 from collections import OrderedDict
+from pathlib import Path
 import typing
 import json
 
-from .config import Config, ConfigArg
+from .config import Config, ConfigArg, json_default
 from .schema import Schema, SchemaArg
 
 
+# When configurations are validated:
+#  - eager: whenever they are created or modified, or their schemas change;
+#  - deferred: once, the first time the merged configuration is read;
+#  - on_save: once, before the merged configuration is saved;
+#  - explicit: only when validate is called.
+VALIDATION_POLICIES = ("eager", "deferred", "on_save", "explicit")
+
+
+def check_validation_policy(policy):
+    if policy not in VALIDATION_POLICIES:
+        raise ValueError("The validation policy must be one of {}. Received {}."
+                         .format(VALIDATION_POLICIES, policy))
+    return policy
+
+
 class ConfigLevel:
 
-    def __init__(self, name, configs=(), interactive=False, read_only=False):
+    __slots__ = ("name", "_configs", "_level_schemas", "interactive", "read_only", "frozen",
+                 "_validation_policy", "validation_count", "registry")
+
+    def __init__(self, name, configs=(), interactive=False, read_only=False,
+                 validation_policy="eager", frozen=False, registry=None):
+        """
+        :param validation_policy: One of VALIDATION_POLICIES. With any policy other
+                                  than 'eager', the level does not validate its
+                                  configurations unless validate is called.
+        :param frozen: If true, the configurations created by the level (i.e., added
+                       as paths or mappings) are frozen (see Config.freeze).
+        :param registry: ConfigRegistry from which the configurations added as paths are
+                         retrieved (as shared, frozen configurations) instead of being loaded.
+        """
         self.name = name
         self._configs = OrderedDict()
-        self._level_schemas = []
+        # Level schemas, keyed by fingerprint so that duplicates are detected in O(1).
+        self._level_schemas = OrderedDict()
         self.interactive = interactive
         self.read_only = read_only
+        self.frozen = frozen
+        self.registry = registry
+        self.validation_policy = validation_policy
+        # Number of validations performed by this level.
+        self.validation_count = 0
 
         if isinstance(configs, OrderedDict):
             for config_name, config in configs.items():
@@ -24,16 +59,24 @@ class ConfigLevel:
         elif isinstance(configs, Config):
             self.add_config(configs)
 
+    @property
+    def validation_policy(self) -> str:
+        return self._validation_policy
+
+    @validation_policy.setter
+    def validation_policy(self, policy: str):
+        self._validation_policy = check_validation_policy(policy)
+
     def to_json(self):
         return {"config_paths": [str(config.path) for config in self.get_configs()],
                 "merged_config": self.config.store,
-                "schemas": [schema.to_json() for schema in self._level_schemas]}
+                "schemas": [schema.to_json() for schema in self._level_schemas.values()]}
 
     def __repr__(self):
         return str(self.to_json())
 
     def __str__(self):
-        return json.dumps(self.to_json(), indent=4, sort_keys=True)
+        return json.dumps(self.to_json(), indent=4, sort_keys=True, default=json_default)
 
     def reorder(self, order):
         keys = list(self._configs.keys())
@@ -58,9 +101,22 @@ class ConfigLevel:
         if read_only is None:
             read_only = self.read_only
 
-        if not isinstance(config, Config):
+        if self.registry is not None and isinstance(config, (str, Path)):
+            # Registered configurations are shared and therefore always frozen.
+            validate = self.validation_policy == "eager"
+            if validate:
+                self.validation_count += 1
+            config = self.registry.get(config, schemas=schemas, insertion_node=insertion_node,
+                                       read_only=read_only, validate=validate)
+        elif not isinstance(config, Config):
             config = Config(config=config, schemas=schemas,
-                            insertion_node=insertion_node, read_only=read_only)
+                            insertion_node=insertion_node, read_only=read_only,
+                            validate=False)
+            if self.validation_policy == "eager":
+                self.validation_count += 1
+                config.validate()
+            if self.frozen:
+                config.freeze()
 
         if name is None:
             no = len(self._configs)
@@ -70,23 +126,36 @@ class ConfigLevel:
 
         self._configs[name] = config
 
+    def _add_schema(self, schema):
+        if not isinstance(schema, Schema):
+            schema = Schema(schema)
+        self._level_schemas.setdefault(schema.fingerprint, schema)
+
     def set_schemas(self, schemas):
-        self._level_schemas = schemas
-        self.validate()
+        self._level_schemas = OrderedDict()
+        if not isinstance(schemas, list):
+            schemas = [schemas]
+        for schema in schemas:
+            self._add_schema(schema)
+        if self.validation_policy == "eager":
+            self.validate()
 
     def add_schema(self, schema):
-        if not isinstance(schema, Schema):
-            schema = Schema(schema)
-        self._level_schemas.append(schema)
-        self.validate()
+        self._add_schema(schema)
+        if self.validation_policy == "eager":
+            self.validate()
 
     def validate(self, raise_exception=True, interactive=None):
         if interactive is None:
             interactive = self.interactive
+        self.validation_count += 1
         config = self.config
         config.save()
         config.validate(raise_exception=raise_exception, interactive=interactive)
 
+    def get_schemas(self):
+        return list(self._level_schemas.values())
+
     def get_configs(self, as_dict=False):
         if as_dict:
             return self._configs
@@ -110,5 +179,5 @@ class ConfigLevel:
         for config in self._configs.values():
             return_config = return_config + config
         return_config.delete_tmp_files = True
-        return_config.add_schemas(self._level_schemas)
+        return_config.add_schemas(list(self._level_schemas.values()))
         return return_config
@@ -1,11 +1,31 @@
 from collections import OrderedDict
+from contextlib import contextmanager
 import typing
 from typing import List
 import json
 from pathlib import Path
 
-from .configlevel import ConfigLevel
+from .configlevel import ConfigLevel, check_validation_policy
 from .config import Config, ConfigArg
+from .cache import ConfigCache
+from .registry import ConfigRegistry, default_registry
+from .bundle import ConfigBundle, key_provenance_tree, flatten_tree
+from .schema import Schema
+from .exceptions import StaleBundle
+from .utils import content_hash
+from .diff import ConfigDiff
+from .transaction import Transaction
+from .query import QueryResult
+from .subscriptions import Subscription, SubscriptionTrie, ANY_PATH
+
+
+def _mutable(config: Config) -> Config:
+    # The merged configuration can be modified, even when it is made of a single
+    # frozen configuration (e.g., of the application level or from a registry).
+    # Its subtrees are shared with the frozen configuration until modified.
+    if config.frozen:
+        return Config(config, validate=False)
+    return config
 
 
 class ConfigMng:
@@ -57,7 +77,11 @@ class ConfigMng:
                  user_configs: typing.Optional[ConfigArg] = None,
                  project_configs: typing.Optional[ConfigArg] = None,
                  application_configs: typing.Optional[ConfigArg] = None,
-                 interactive: bool = True):
+                 interactive: bool = True,
+                 cache: typing.Optional[typing.Union[ConfigCache, str, Path]] = None,
+                 validation_policy: str = "eager",
+                 intern_subtrees: bool = False,
+                 registry: typing.Optional[typing.Union[bool, ConfigRegistry]] = None):
         """
         :param instance_configs: Configuration files for the 'instance' level.
         :param user_configs: Configuration for the 'user' level.
@@ -65,14 +89,51 @@ class ConfigMng:
         :param application_configs: Configuration for the 'application' level.
         :param interactive: If true, validation errors will prompt users for information to correct
                             the error or the missing fields. If false, validation errors raises exceptions.
+        :param cache: ConfigCache, or path of its database, used to retrieve already validated
+                      merged configurations instead of merging and validating them again.
+        :param validation_policy: When the configurations are validated; one of 'eager' (whenever
+                                  they change), 'deferred' (once, when the merged configuration
+                                  is first read), 'on_save' (once, before save_config), or
+                                  'explicit' (only when validate is called).
+        :param intern_subtrees: If true, the subtrees of the configurations and of the merged
+                                configuration are interned (see Config.intern) so that identical
+                                subtrees are stored once across all ConfigMng objects.
+        :param registry: ConfigRegistry from which the configuration files are retrieved as shared,
+                         frozen configurations, or True to use the process-wide registry
+                         (registry.default_registry).
         """
         self.interactive = interactive
+        self.intern_subtrees = intern_subtrees
+        if registry is True:
+            registry = default_registry
+        elif registry is False:
+            registry = None
+        self.registry: typing.Optional[ConfigRegistry] = registry
+        self._validation_policy = check_validation_policy(validation_policy)
+        self._validation_pending = False
+        # Number of validations of the merged configuration.
+        self.validation_count = 0
+        if cache is not None and not isinstance(cache, ConfigCache):
+            cache = ConfigCache(cache)
+        self.cache: typing.Optional[ConfigCache] = cache
+        self._bundle: typing.Optional[ConfigBundle] = None
+        self._transaction: typing.Optional[Transaction] = None
+        self._merged_config: typing.Optional[Config] = None
+        self._subscriptions: typing.Optional[SubscriptionTrie] = None
+        # Subscription of the merged configuration forwarding its modifications
+        # to self._subscriptions.
+        self._forwarder: typing.Optional[Subscription] = None
 
         self._levels: typing.Mapping[str, ConfigLevel] = OrderedDict([
-            ("application", ConfigLevel("application", interactive=False, read_only=True)),
-            ("project", ConfigLevel("project", interactive=self.interactive)),
-            ("user", ConfigLevel("user", interactive=self.interactive)),
-            ("instance", ConfigLevel("instance", interactive=self.interactive))])
+            ("application", ConfigLevel("application", interactive=False, read_only=True,
+                                        validation_policy=validation_policy, frozen=True,
+                                        registry=self.registry)),
+            ("project", ConfigLevel("project", interactive=self.interactive,
+                                    validation_policy=validation_policy, registry=self.registry)),
+            ("user", ConfigLevel("user", interactive=self.interactive,
+                                 validation_policy=validation_policy, registry=self.registry)),
+            ("instance", ConfigLevel("instance", interactive=self.interactive,
+                                     validation_policy=validation_policy, registry=self.registry))])
 
         #if merged_schemas is None:
         #    self._merged_schemas: list = []
@@ -130,7 +191,9 @@ class ConfigMng:
         new_levels = OrderedDict()
         for name, level in self._levels.items():
             if name == "user":
-                new_levels[new_level_name] = ConfigLevel(new_level_name, interactive=interactive)
+                new_levels[new_level_name] = ConfigLevel(new_level_name, interactive=interactive,
+                                                         validation_policy=self.validation_policy,
+                                                         registry=self.registry)
             new_levels[name] = level
         self._levels = new_levels
 
@@ -166,10 +229,222 @@ class ConfigMng:
     def reorder_a_level(self, level_name: str, order: typing.Iterable):
         self._levels[level_name].reorder(order)
 
+    def get_level(self, level_name: str) -> ConfigLevel:
+        return self._levels[level_name]
+
+    def key_provenance(self) -> typing.Dict[tuple, tuple]:
+        """
+         Return a dict mapping the path (tuple of keys) of every leaf of the merged
+         configuration to the (level name, config name) from which its value comes.
+        """
+        configs = self.get_configs()
+        if self._bundle is not None and len(configs) == 1:
+            return self._bundle.provenance
+
+        tree = {}
+        for level_name, level in self._levels.items():
+            for config_name, config in level.get_configs(as_dict=True).items():
+                node = tree
+                for key in config.insertion_node:
+                    if not isinstance(node.get(key), dict):
+                        node[key] = {}
+                    node = node[key]
+                key_provenance_tree(node, config.store, (level_name, config_name))
+        return flatten_tree(tree)
+
+    def diff_levels(self) -> "OrderedDict[str, ConfigDiff]":
+        """
+         Return, for each level, the differences its configurations make to the
+         merge of the previous levels (e.g., what the instance level overrides).
+        """
+        diffs = OrderedDict()
+        merged_config = Config()
+        for level_name, level in self._levels.items():
+            if len(level.get_configs()):
+                level_merged_config = merged_config + level.config
+                diffs[level_name] = merged_config.diff(level_merged_config)
+                merged_config = level_merged_config
+            else:
+                diffs[level_name] = ConfigDiff()
+        return diffs
+
+    def compile(self, path) -> ConfigBundle:
+        """
+         Validate this configuration and save it, along with its merged schema, its
+         per-key provenance, and a certificate of the inputs it has been built from,
+         as a bundle file that can be loaded with ConfigMng.from_bundle.
+
+        :param path: Path of the bundle file.
+        """
+        bundle = ConfigBundle.from_config_mng(self)
+        bundle.save(path)
+        return bundle
+
+    @staticmethod
+    def from_bundle(path, check_stale: bool = True, interactive: bool = False) -> "ConfigMng":
+        """
+         Load a bundle written by ConfigMng.compile. No YAML file is parsed and no
+         schema is merged or validated. The merged configuration is loaded as a
+         single read-only configuration of the application level.
+
+        :param path: Path of the bundle file.
+        :param check_stale: If true, a StaleBundle exception is raised if a source
+                            file of the bundle changed since it was compiled.
+        :param interactive: Passed to the ConfigMng constructor.
+        """
+        bundle = ConfigBundle.load(path)
+        if check_stale:
+            stale_sources = bundle.stale_sources()
+            if len(stale_sources):
+                raise StaleBundle("The configuration bundle {} is stale. These source ".format(path) +
+                                  "files changed since it was compiled: {}."
+                                  .format([str(source) for source in stale_sources]))
+
+        config = Config(read_only=True)
+        config.store = bundle.store
+        if bundle.schema_data is not None:
+            config.add_schemas(Schema.from_data(bundle.schema_data))
+        config.freeze()
+
+        config_mng = ConfigMng(interactive=interactive)
+        config_mng._bundle = bundle
+        config_mng.get_level("application").add_config(config, "bundle")
+        config_mng._update_merged_config(validate=False)
+        return config_mng
+
+    @property
+    def validation_policy(self) -> str:
+        return self._validation_policy
+
+    @validation_policy.setter
+    def validation_policy(self, policy: str):
+        self._validation_policy = check_validation_policy(policy)
+        for level in self._levels.values():
+            level.validation_policy = policy
+        if policy == "eager" and self._validation_pending:
+            self.validate()
+
+    @property
+    def validation_stats(self) -> dict:
+        return {"policy": self.validation_policy,
+                "pending": self._validation_pending,
+                "merged_config": self.validation_count,
+                "levels": {name: level.validation_count for name, level in self._levels.items()}}
+
     @property
     def config(self):
+        if self._validation_pending and self.validation_policy == "deferred":
+            self.validate()
         return self._merged_config
 
+    @contextmanager
+    def transaction(self, validate: bool = True):
+        """
+         Context manager deferring the merging and validation of the configurations
+         added or modified in its block (e.g., with add_config, set_level_configs, or
+         set_level_schemas) to a single update on exit. The levels do not validate
+         their configurations in the block. Modifications of the merged configuration
+         itself (e.g., mng.config["key"] = value) are buffered as in Config.transaction.
+         If the update (or the block) raises an exception, the levels and the merged
+         configuration are restored to their state from before the transaction.
+
+        :param validate: If false, the merged configuration is not validated on exit.
+        """
+        if self._transaction is not None:
+            yield self
+            return
+
+        levels = self._levels
+        level_states = [(level, OrderedDict(level._configs), OrderedDict(level._level_schemas),
+                         level.validation_policy) for level in levels.values()]
+        merged_config = self._merged_config
+        validation_pending = self._validation_pending
+
+        def restore_policies():
+            for level, _, _, policy in level_states:
+                level.validation_policy = policy
+
+        for level in levels.values():
+            level.validation_policy = "explicit"
+        merged_context = merged_config.transaction(validate=False)
+        merged_context.__enter__()
+        merged_transaction = merged_config._transaction
+
+        transaction = self._transaction = Transaction()
+        try:
+            yield self
+            self._transaction = None
+            restore_policies()
+            if transaction.update_pending:
+                self._update_merged_config(validate=validate and transaction.validate_pending)
+            elif validate and merged_transaction.touched:
+                self.validate()
+        except BaseException as error:
+            self._transaction = None
+            restore_policies()
+            # Rolls back the modifications of the merged configuration.
+            merged_context.__exit__(type(error), error, error.__traceback__)
+            self._levels = levels
+            for level, configs, level_schemas, _ in level_states:
+                level._configs = configs
+                level._level_schemas = level_schemas
+            self._set_merged_config(merged_config)
+            self._validation_pending = validation_pending
+            raise
+        merged_context.__exit__(None, None, None)
+
+    def _set_merged_config(self, config: Config):
+        old_config = self._merged_config
+        self._merged_config = config
+        if self._subscriptions is None:
+            return
+        if self._forwarder is not None:
+            self._forwarder.cancel()
+        self._forwarder = config.subscribe(ANY_PATH, self._forward_changes, all_paths=True)
+        if old_config is not None and old_config is not config:
+            self._subscriptions.dispatch(config, old_config.diff(config).paths)
+
+    def _forward_changes(self, config: Config, paths: typing.List[tuple]):
+        self._subscriptions.dispatch(config, paths)
+
+    def subscribe(self, path_pattern, callback: typing.Callable) -> Subscription:
+        """
+         Call callback(config, path) whenever a node of the merged configuration
+         matching path_pattern is modified (see Config.subscribe), including when
+         the merged configuration is updated after a change of the levels (e.g.,
+         add_config, set_level_configs). In the latter case, only the subscriptions
+         matching the paths that differ between the old and the new merged
+         configurations are called.
+        """
+        if self._subscriptions is None:
+            self._subscriptions = SubscriptionTrie()
+            self._set_merged_config(self._merged_config)
+        return self._subscriptions.add(path_pattern, callback)
+
+    def query(self, pattern: str) -> typing.List[QueryResult]:
+        """
+         Return the values matching pattern (see Config.query) in the configurations
+         of all the levels, in merging order, with the level and the name of the
+         configuration they come from. Paths include the insertion nodes of the
+         configurations. The key paths of each configuration are indexed once.
+        """
+        results = []
+        for level_name, level in self._levels.items():
+            for config_name, config in level.get_configs(as_dict=True).items():
+                for result in config.query(pattern, insertion_node=True):
+                    result.level = level_name
+                    result.config_name = config_name
+                    results.append(result)
+        return results
+
+    def resolve(self, path: typing.Sequence = ()):
+        """
+         Return the value at path of the merged configuration with its ${...}
+         references resolved (see Config.resolve). References can point to keys
+         defined at any level.
+        """
+        return self.config.resolve(path)
+
     def get_configs(self):
         configs = []
         for level in self._levels.values():
@@ -182,29 +457,91 @@ class ConfigMng:
     #        schemas.extend(level.get_schemas())
     #    return schemas
 
+    def _cache_key(self):
+        components = [list(self.level_order)]
+        for level_name, level in self._levels.items():
+            # The cached fingerprints of mutable configurations do not see the nested
+            # mappings modified in place (e.g., config["a"]["b"] = 1).
+            configs = [(name, config.fingerprint() if config.frozen else content_hash(config.store),
+                        list(config.insertion_node),
+                        [content_hash(schema.load(copy=False)) for schema in config.schemas])
+                       for name, config in level.get_configs(as_dict=True).items()]
+            level_schemas = [content_hash(schema.load(copy=False)) for schema in level.get_schemas()]
+            components.append([level_name, configs, level_schemas])
+        return ConfigCache.make_key(components)
+
+    def _set_cached_merged_config(self, store, configs):
+        if len(configs) == 1:
+            self._set_merged_config(_mutable(configs[0]))
+            return
+
+        merged_config = Config()
+        merged_config.store = store
+        # Schemas are added in the same order as when merging the levels.
+        for level in self._levels.values():
+            for config in level.get_configs():
+                merged_config.add_schemas(config.schemas)
+            if len(level.get_configs()) > 1:
+                merged_config.add_schemas(level.get_schemas())
+        merged_config.provenance.merging(configs)
+        self._set_merged_config(merged_config)
+
     def _update_merged_config(self, validate=True):
+        if self._transaction is not None:
+            self._transaction.update_pending = True
+            self._transaction.validate_pending |= validate
+            return
+
         configs = self.get_configs()
+        self._validation_pending = False
         if len(configs) == 0:
-            self._merged_config = Config()
+            self._set_merged_config(Config())
             return
+        if self.intern_subtrees:
+            for config in configs:
+                config.intern()
+
+        key = None
+        if validate and self.cache is not None:
+            key = self._cache_key()
+            store = self.cache.get(key)
+            if store is not None:
+                self._set_cached_merged_config(store, configs)
+                if self.intern_subtrees:
+                    self._merged_config.intern()
+                return
 
         if len(configs) == 1:
-            self._merged_config = configs[0]
+            self._set_merged_config(_mutable(configs[0]))
         else:
-            self._merged_config = Config()
+            merged_config = Config()
             for level in self._levels.values():
-                self._merged_config += level.config
+                merged_config += level.config
+            if self.intern_subtrees:
+                merged_config.intern()
+            self._set_merged_config(merged_config)
 
         #self._merged_config.add_schemas(self._merged_schemas)
-        if validate:
+        if validate and self.validation_policy != "eager":
+            self._validation_pending = True
+        elif validate:
+            fingerprint = None if key is None else self._merged_config.fingerprint()
             self.validate(interactive=self.interactive)
+            # Configurations modified while interactively fixing validation
+            # errors are not cached since they no longer match the key.
+            if key is not None and self._merged_config.fingerprint() == fingerprint:
+                self.cache.put(key, self._merged_config.store)
 
     def validate(self, raise_exception=True, interactive=None):
         if interactive is None:
             interactive = self.interactive
+        self.validation_count += 1
         self._merged_config.validate(raise_exception, interactive)
+        self._validation_pending = False
 
     def save_config(self, path=None):
+        if self._validation_pending and self.validation_policy in ("deferred", "on_save"):
+            self.validate()
         self._merged_config.save(path)
 
     def make_serializable(self):
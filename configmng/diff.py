@@ -0,0 +1,87 @@
+from collections.abc import Mapping
+import typing
+
+from .frozen import is_frozen
+from .numeric import NumericSequence
+
+
+class ConfigDiff:
+    """
+     Differences between two configuration stores, as dicts keyed by key paths
+     (tuples): added (new values), removed (old values), and changed ((old, new)
+     value pairs). Mappings are compared key by key; other values (including
+     lists) are compared as a whole.
+    """
+
+    __slots__ = ("added", "removed", "changed")
+
+    def __init__(self):
+        self.added: typing.Dict[tuple, typing.Any] = {}
+        self.removed: typing.Dict[tuple, typing.Any] = {}
+        self.changed: typing.Dict[tuple, typing.Tuple[typing.Any, typing.Any]] = {}
+
+    @property
+    def paths(self) -> typing.List[tuple]:
+        return sorted(list(self.added) + list(self.removed) + list(self.changed), key=str)
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def to_json(self):
+        return {"added": {"/".join(map(str, path)): value for path, value in self.added.items()},
+                "removed": {"/".join(map(str, path)): value for path, value in self.removed.items()},
+                "changed": {"/".join(map(str, path)): {"old": old, "new": new}
+                            for path, (old, new) in self.changed.items()}}
+
+    def __repr__(self):
+        return "ConfigDiff(added={}, removed={}, changed={})".format(
+            len(self.added), len(self.removed), len(self.changed))
+
+
+def _known_hash(data) -> typing.Optional[str]:
+    # Content hash of data if it is already known (i.e., without computing it).
+    # Only the hashes of frozen nodes are used, since they cannot be stale.
+    if is_frozen(data):
+        return data._content_hash
+    return None
+
+
+def _same_value(old, new) -> bool:
+    # Values of different types (e.g., 1 and True) differ, except sequences.
+    if isinstance(old, (list, NumericSequence)) and isinstance(new, (list, NumericSequence)):
+        return old == new
+    return type(old) is type(new) and old == new
+
+
+def _diff(old, new, path, result: ConfigDiff):
+    if old is new:
+        return
+    old_hash = _known_hash(old)
+    if old_hash is not None and old_hash == _known_hash(new):
+        return
+
+    if isinstance(old, Mapping) and isinstance(new, Mapping):
+        for key, old_value in old.items():
+            if key in new:
+                _diff(old_value, new[key], path + (key,), result)
+            else:
+                result.removed[path + (key,)] = old_value
+        for key, new_value in new.items():
+            if key not in old:
+                result.added[path + (key,)] = new_value
+    elif not _same_value(old, new):
+        result.changed[path] = (old, new)
+
+
+def diff_stores(old: Mapping, new: Mapping) -> ConfigDiff:
+    """
+     Return the differences from old to new. Identical subtrees are skipped
+     without being visited when they are the same object, or when they are
+     frozen (e.g., interned) nodes whose content hashes are already known.
+    """
+    result = ConfigDiff()
+    _diff(old, new, (), result)
+    return result
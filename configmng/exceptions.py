@@ -24,3 +24,23 @@ class UndefinedSequenceMerging(Exception):
 class MappingNonMappingMerging(Exception):
     def __init__(self, keys: typing.Iterable):
         self.keys = keys
+
+
+class StaleBundle(Exception):
+    def __init__(self, message: str):
+        self.message = message
+
+
+class ReferenceCycle(Exception):
+    def __init__(self, message: str):
+        self.message = message
+
+
+class UnresolvedReference(Exception):
+    def __init__(self, message: str):
+        self.message = message
+
+
+class LockTimeout(Exception):
+    def __init__(self, message: str):
+        self.message = message
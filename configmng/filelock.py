@@ -0,0 +1,60 @@
+from contextlib import contextmanager
+from pathlib import Path
+import os
+import random
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from .exceptions import LockTimeout
+
+
+# Number of seconds Config.save waits for other writers of the same file.
+DEFAULT_LOCK_TIMEOUT = 60.0
+
+
+@contextmanager
+def locked_file(path, timeout: float = DEFAULT_LOCK_TIMEOUT):
+    """
+     Hold an advisory exclusive lock (flock) on the existing file at path.
+     Writers replace the file by renaming a new file over it, so the lock is
+     taken again if the file has been replaced while waiting for it. Waiting
+     writers poll the lock with a randomized exponential backoff. Without
+     fcntl (i.e., on Windows), no lock is taken.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    path = str(Path(path))
+    deadline = time.monotonic() + timeout
+    delay = 0.001
+    while True:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            if time.monotonic() > deadline:
+                raise LockTimeout("Could not lock {} within {} seconds.".format(path, timeout))
+            time.sleep(delay * (0.5 + random.random()))
+            delay = min(2 * delay, 0.1)
+            continue
+
+        try:
+            replaced = os.fstat(fd).st_ino != os.stat(path).st_ino
+        except FileNotFoundError:
+            replaced = True
+        if not replaced:
+            break
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
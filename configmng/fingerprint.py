@@ -0,0 +1,88 @@
+from collections.abc import Mapping
+import typing
+
+from .utils import content_hash, hash_mapping
+
+
+class _HashNode:
+    __slots__ = ("hash", "children")
+
+    def __init__(self):
+        self.hash: typing.Optional[str] = None
+        self.children: typing.Dict[typing.Hashable, "_HashNode"] = {}
+
+
+class FingerprintCache:
+    """
+     Merkle-style cache of the content hashes of the nodes of nested mappings.
+     The hash of a mapping is computed from the hashes of its values, so that
+     after a change only the hashes along the modified path need to be
+     recomputed. The hash of any node is equal to utils.content_hash(node).
+
+     The cache is not aware of changes made directly to the nested mappings;
+     these must be reported with invalidate or invalidate_update.
+    """
+
+    def __init__(self):
+        self._root = _HashNode()
+
+    @property
+    def root(self) -> _HashNode:
+        return self._root
+
+    def fingerprint(self, data, path: typing.Sequence = ()) -> str:
+        node = self._root
+        for key in path:
+            data = data[key]
+            node = node.children.setdefault(key, _HashNode())
+        return self._hash(data, node)
+
+    def _hash(self, data, node: _HashNode) -> str:
+        if node.hash is None:
+            if isinstance(data, Mapping):
+                children = node.children
+                node.hash = hash_mapping((key, self._hash(value, children.setdefault(key, _HashNode())))
+                                         for key, value in data.items())
+            else:
+                node.hash = content_hash(data)
+        return node.hash
+
+    def _clear_path(self, path: typing.Sequence) -> typing.Optional[_HashNode]:
+        # Clear the hashes of the nodes along path and return the node at path.
+        node = self._root
+        node.hash = None
+        for key in path:
+            node = node.children.get(key)
+            if node is None:
+                return None
+            node.hash = None
+        return node
+
+    def invalidate(self, path: typing.Sequence = ()):
+        """
+         Invalidate the hashes of the node at path, of its ancestors, and of
+         all its descendants.
+        """
+        node = self._clear_path(path)
+        if node is not None:
+            node.children.clear()
+
+    def invalidate_update(self, update: Mapping, path: typing.Sequence = ()):
+        """
+         Invalidate the hashes of the nodes modified by recursively updating
+         the node at path with the update mapping (see utils.update).
+        """
+        def _invalidate(update_node, node):
+            for key, value in update_node.items():
+                child = node.children.get(key)
+                if child is None:
+                    continue
+                child.hash = None
+                if isinstance(value, Mapping):
+                    _invalidate(value, child)
+                else:
+                    child.children.clear()
+
+        node = self._clear_path(path)
+        if node is not None:
+            _invalidate(update, node)
@@ -0,0 +1,154 @@
+from collections.abc import Mapping
+import typing
+
+
+def node_hash(node) -> int:
+    """
+     Python hash of nested mappings, sequences and scalars consistent with their
+     equality: values that compare equal (e.g., 1, 1.0 and True, or a list and a
+     NumericSequence holding the same numbers) have the same hash. Unlike
+     content_hash, it is neither stable across processes nor type-sensitive.
+    """
+    if isinstance(node, (FrozenDict, FrozenList)):
+        return hash(node)
+    if isinstance(node, Mapping):
+        return hash(frozenset((key, node_hash(value)) for key, value in node.items()))
+    if isinstance(node, (str, bytes)):
+        return hash(node)
+    if isinstance(node, typing.Sequence) or hasattr(node, "__array__"):
+        return hash(tuple(node_hash(value) for value in node))
+    return hash(node)
+
+
+def _immutable(self, *args, **kwargs):
+    raise TypeError("{} objects are immutable. Frozen configuration nodes are shared between "
+                    "configurations; modify them through Config (e.g., Config.set_value_at_path), "
+                    "which copies them on write.".format(type(self).__name__))
+
+
+class FrozenDict(dict):
+    """
+     Immutable and hashable dict. It is a dict subclass so that code checking
+     for dicts (e.g., YAML and JSON serialization) handles it transparently.
+    """
+
+    __slots__ = ("_content_hash", "_hash", "__weakref__")
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._content_hash: typing.Optional[str] = None
+        self._hash: typing.Optional[int] = None
+
+    @property
+    def content_hash(self) -> str:
+        if self._content_hash is None:
+            from .utils import content_hash
+            self._content_hash = content_hash(self)
+        return self._content_hash
+
+    def __hash__(self):
+        # Not derived from content_hash, which distinguishes values that compare
+        # equal (e.g., 1 and 1.0).
+        if self._hash is None:
+            self._hash = hash(frozenset((key, node_hash(value)) for key, value in self.items()))
+        return self._hash
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def copy(self):
+        return dict(self)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce_ex__(self, protocol):
+        return FrozenDict, (dict(self),)
+
+    def __repr__(self):
+        return "FrozenDict({})".format(dict.__repr__(self))
+
+
+class FrozenList(list):
+    """
+     Immutable and hashable list (see FrozenDict).
+    """
+
+    __slots__ = ("_content_hash", "_hash", "__weakref__")
+
+    def __init__(self, *args):
+        list.__init__(self, *args)
+        self._content_hash: typing.Optional[str] = None
+        self._hash: typing.Optional[int] = None
+
+    @property
+    def content_hash(self) -> str:
+        if self._content_hash is None:
+            from .utils import content_hash
+            self._content_hash = content_hash(self)
+        return self._content_hash
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(tuple(node_hash(value) for value in self))
+        return self._hash
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable
+
+    def copy(self):
+        return list(self)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce_ex__(self, protocol):
+        return FrozenList, (list(self),)
+
+    def __repr__(self):
+        return "FrozenList({})".format(list.__repr__(self))
+
+
+def is_frozen(node) -> bool:
+    return isinstance(node, (FrozenDict, FrozenList))
+
+
+def thaw(node):
+    """
+     Return a mutable shallow copy of a frozen node, or the node itself if
+     it is not frozen. The children of the copy are still shared.
+    """
+    if isinstance(node, FrozenDict):
+        return dict(node)
+    if isinstance(node, FrozenList):
+        return list(node)
+    return node
+
+
+def thaw_child(parent, key):
+    """
+     Return the child of parent at key, replacing it in parent by a mutable
+     copy first if it is frozen (copy-on-write).
+    """
+    child = parent[key]
+    if is_frozen(child):
+        child = thaw(child)
+        parent[key] = child
+    return child
+
+
+def thaw_path(store, path: typing.Sequence):
+    """
+     Return the node at path, after replacing the frozen nodes along path
+     (including the returned node) by mutable copies.
+    """
+    node = store
+    for key in path:
+        node = thaw_child(node, key)
+    return node
@@ -0,0 +1,109 @@
+from collections.abc import Mapping
+import sys
+import typing
+import weakref
+
+from .frozen import FrozenDict, FrozenList, is_frozen
+from .numeric import _numeric_dtype
+from .utils import content_hash, hash_mapping, hash_sequence
+
+
+class InternPool:
+    """
+     Hash-consing pool of frozen configuration subtrees. Interning a subtree
+     returns a frozen copy of it whose nodes are shared with all the subtrees
+     with the same content interned in the same pool. Nodes are keyed by their
+     content hash (see utils.content_hash) and only held weakly, so that they
+     are freed when no configuration uses them anymore.
+    """
+
+    def __init__(self):
+        self._nodes = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def intern(self, data):
+        return self._intern(data)[0]
+
+    def _intern(self, data) -> typing.Tuple[typing.Any, str]:
+        # Return the interned node and its content hash.
+        if is_frozen(data) and data._content_hash is not None \
+                and self._nodes.get(data._content_hash) is data:
+            self.hits += 1
+            return data, data._content_hash
+
+        if isinstance(data, Mapping):
+            children = {}
+            hashes = []
+            for key, value in data.items():
+                children[key], value_hash = self._intern(value)
+                hashes.append((key, value_hash))
+            key = hash_mapping(hashes)
+            node_type = FrozenDict
+        elif isinstance(data, list):
+            if len(data) and _numeric_dtype(data) is not None:
+                children = data
+                key = content_hash(data)
+            else:
+                interned = [self._intern(value) for value in data]
+                children = [value for value, _ in interned]
+                key = hash_sequence(value_hash for _, value_hash in interned)
+            node_type = FrozenList
+        elif isinstance(data, str):
+            return sys.intern(data), content_hash(data)
+        else:
+            return data, content_hash(data)
+
+        node = self._nodes.get(key)
+        if node is None:
+            self.misses += 1
+            node = node_type(children)
+            node._content_hash = key
+            self._nodes[key] = node
+        else:
+            self.hits += 1
+        return node, key
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"nodes": len(self._nodes),
+                "hits": self.hits,
+                "misses": self.misses,
+                "dedup_ratio": lookups / self.misses if self.misses else 1.0}
+
+
+# Pool used by Config.intern when no pool is given.
+default_pool = InternPool()
+
+
+def memory_report(configs: typing.Iterable) -> dict:
+    """
+     Report the number and the (shallow) size in bytes of the mapping and list
+     nodes of the stores of configs, counting shared nodes once per reference
+     ('nodes', 'bytes') and once overall ('unique_nodes', 'unique_bytes').
+     The deduplication ratio is nodes / unique_nodes.
+    """
+    report = {"nodes": 0, "unique_nodes": 0, "bytes": 0, "unique_bytes": 0}
+    seen = set()
+
+    def _visit(node):
+        if not isinstance(node, (Mapping, list)):
+            return
+        size = sys.getsizeof(node)
+        report["nodes"] += 1
+        report["bytes"] += size
+        if id(node) not in seen:
+            seen.add(id(node))
+            report["unique_nodes"] += 1
+            report["unique_bytes"] += size
+        for value in (node.values() if isinstance(node, Mapping) else node):
+            _visit(value)
+
+    for config in configs:
+        _visit(config.store)
+    report["dedup_ratio"] = report["nodes"] / report["unique_nodes"] if report["unique_nodes"] else 1.0
+    return report
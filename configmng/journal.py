@@ -0,0 +1,179 @@
+from collections.abc import Mapping
+from copy import deepcopy
+from pathlib import Path
+import pickle
+import time
+import typing
+
+from .frozen import is_frozen
+
+
+class _Missing:
+    # Value of the records of nodes created (old) or deleted (new).
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "MISSING"
+
+    def __reduce__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+# Maximum number of records kept in memory by default. Beyond that, the oldest
+# records are compacted (see ChangeJournal.compact).
+DEFAULT_MAX_RECORDS = 1000
+
+
+def detach(value):
+    # Copy of value that later in-place modifications of the store cannot alter.
+    if is_frozen(value) or not isinstance(value, (Mapping, list)):
+        return value
+    return deepcopy(value)
+
+
+def update_changes(store: Mapping, update_mapping: Mapping, path: tuple = ()):
+    """
+     Yield the (path, old, new) changes that utils.update(store, update_mapping)
+     is going to make, i.e., for the first node along each updated path that is
+     either missing or not a mapping.
+    """
+    for key, value in update_mapping.items():
+        child_path = path + (key,)
+        if key in store and isinstance(store[key], Mapping) and isinstance(value, Mapping):
+            yield from update_changes(store[key], value, child_path)
+        else:
+            yield child_path, store.get(key, MISSING), value
+
+
+class JournalRecord:
+
+    __slots__ = ("timestamp", "path", "old", "new", "source")
+
+    def __init__(self, timestamp: float, path: tuple, old, new, source: typing.Optional[str] = None):
+        self.timestamp = timestamp
+        self.path = path
+        self.old = old
+        self.new = new
+        self.source = source
+
+    def __reduce__(self):
+        return JournalRecord, (self.timestamp, self.path, self.old, self.new, self.source)
+
+    def __eq__(self, other):
+        return isinstance(other, JournalRecord) and self.__reduce__() == other.__reduce__()
+
+    def __repr__(self):
+        return "JournalRecord({}, {!r}: {!r} -> {!r}, source={!r})".format(
+            self.timestamp, "/".join(map(str, self.path)), self.old, self.new, self.source)
+
+
+class ChangeJournal:
+    """
+     Append-only journal of the modifications of a configuration, as
+     (timestamp, path, old, new, source) records. Records hold copies of the
+     modified values, not references to the configurations they come from.
+
+     When more than max_records records are held, the oldest half is compacted
+     into a snapshot keeping, for each path, the value before the first compacted
+     modification and the value after the last one. If spill_path is given,
+     compacted records are first appended to that file so that the complete
+     history remains available to history.
+    """
+
+    __slots__ = ("max_records", "spill_path", "_records", "_snapshot", "compactions")
+
+    def __init__(self, max_records: int = DEFAULT_MAX_RECORDS,
+                 spill_path: typing.Optional[typing.Union[str, Path]] = None):
+        if max_records < 1:
+            raise ValueError("max_records must be positive. Received {}.".format(max_records))
+        self.max_records = max_records
+        self.spill_path = None if spill_path is None else Path(spill_path)
+        self._records: typing.List[JournalRecord] = []
+        self._snapshot: typing.Dict[tuple, JournalRecord] = {}
+        self.compactions = 0
+
+    def record(self, path: typing.Sequence, old, new, source: typing.Optional[str] = None):
+        self._records.append(JournalRecord(time.time(), tuple(path), old, detach(new), source))
+        if len(self._records) > self.max_records:
+            self.compact(len(self._records) - self.max_records // 2)
+
+    def compact(self, n_records: typing.Optional[int] = None):
+        """
+         Fold the n_records oldest records (all records by default) into the snapshot.
+        """
+        if n_records is None:
+            n_records = len(self._records)
+        compacted = self._records[:n_records]
+        if not compacted:
+            return
+        if self.spill_path is not None:
+            with self.spill_path.open("ab") as stream:
+                for record in compacted:
+                    pickle.dump(record, stream)
+        for record in compacted:
+            previous = self._snapshot.pop(record.path, None)
+            old = record.old if previous is None else previous.old
+            # Re-inserted so that the snapshot stays ordered by last modification.
+            self._snapshot[record.path] = JournalRecord(record.timestamp, record.path,
+                                                        old, record.new, record.source)
+        del self._records[:n_records]
+        self.compactions += 1
+
+    def pop(self) -> typing.Optional[JournalRecord]:
+        """
+         Remove and return the last record, or the last snapshot entry if all the
+         records have been compacted (None if the journal is empty).
+        """
+        if self._records:
+            return self._records.pop()
+        if self._snapshot:
+            return self._snapshot.pop(next(reversed(self._snapshot)))
+        return None
+
+    def _spilled(self) -> typing.Iterator[JournalRecord]:
+        with self.spill_path.open("rb") as stream:
+            while True:
+                try:
+                    yield pickle.load(stream)
+                except EOFError:
+                    return
+
+    def history(self, path: typing.Sequence = (), since: typing.Optional[float] = None,
+                until: typing.Optional[float] = None) -> typing.List[JournalRecord]:
+        """
+         Return, in chronological order, the records of the modifications of the
+         node at path, of its descendants, and of its ancestors, made between since
+         and until (timestamps, as returned by time.time). Compacted records are
+         read from spill_path if any, and otherwise replaced by the snapshot.
+        """
+        path = tuple(path)
+        if self.spill_path is not None and self.spill_path.exists():
+            compacted = self._spilled()
+        else:
+            compacted = self._snapshot.values()
+
+        records = []
+        for records_ in (compacted, self._records):
+            for record in records_:
+                if since is not None and record.timestamp < since:
+                    continue
+                if until is not None and record.timestamp > until:
+                    continue
+                length = min(len(path), len(record.path))
+                if record.path[:length] == path[:length]:
+                    records.append(record)
+        return records
+
+    def __len__(self):
+        return len(self._records) + len(self._snapshot)
+
+    @property
+    def stats(self) -> dict:
+        return {"records": len(self._records),
+                "snapshot": len(self._snapshot),
+                "compactions": self.compactions,
+                "max_records": self.max_records,
+                "spill_path": None if self.spill_path is None else str(self.spill_path)}
@@ -0,0 +1,147 @@
+from collections.abc import Sequence, Mapping
+from numbers import Integral, Real
+from pathlib import Path
+import typing
+
+import numpy as np
+
+
+# Numeric lists shorter than this are left as plain lists by compact_sequences.
+MIN_COMPACT_LENGTH = 16
+
+
+class NumericSequence(Sequence):
+    """
+     Read-only sequence of integers or floats stored in a one-dimensional NumPy
+     array. The array is never modified in place so copies, including the deep
+     copies made when configurations are merged, share the same buffer.
+    """
+
+    def __init__(self, values, dtype=None, path: typing.Optional[Path] = None):
+        if isinstance(values, np.ndarray) and not values.flags.writeable and dtype is None:
+            array = values
+        else:
+            array = np.array(values, dtype=dtype)
+            array.flags.writeable = False
+
+        if array.ndim != 1 or array.dtype.kind not in "iuf":
+            raise TypeError("NumericSequence can only hold one-dimensional integer or float "
+                            "data. Received an array of dtype {} with {} dimensions."
+                            .format(array.dtype, array.ndim))
+        self._array = array
+        self._path = None if path is None else Path(path)
+
+    @staticmethod
+    def from_npy(path, mmap_mode: typing.Optional[str] = "r") -> "NumericSequence":
+        """
+        :param path: Path to a .npy file holding a one-dimensional numeric array.
+        :param mmap_mode: Memory-map mode passed to numpy.load. Use None to load
+                          the whole array in memory.
+        """
+        return NumericSequence(np.load(str(path), mmap_mode=mmap_mode), path=path)
+
+    @property
+    def path(self) -> typing.Optional[Path]:
+        return self._path
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._array
+
+    @property
+    def dtype(self):
+        return self._array.dtype
+
+    def tolist(self):
+        return self._array.tolist()
+
+    def save_npy(self, path):
+        np.save(str(path), self._array)
+
+    def __len__(self):
+        return len(self._array)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return NumericSequence(self._array[index])
+        return self._array[index].item()
+
+    def __iter__(self):
+        return iter(self._array.tolist())
+
+    def __contains__(self, item):
+        if isinstance(item, bool) or not isinstance(item, Real):
+            return False
+        return bool((self._array == item).any())
+
+    def __eq__(self, other):
+        if isinstance(other, NumericSequence):
+            return bool(np.array_equal(self._array, other.array))
+        if isinstance(other, (list, tuple)):
+            if len(other) != len(self._array) or _numeric_dtype(other) is None:
+                return False
+            return bool(np.array_equal(self._array, np.asarray(other)))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self._array
+        return self._array.astype(dtype)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # Memory-mapped arrays are pickled as plain (read-only) arrays.
+        return NumericSequence, (np.array(self._array), None, self._path)
+
+    def __repr__(self):
+        return "NumericSequence(dtype={}, len={}{})".format(
+            self._array.dtype, len(self._array),
+            "" if self._path is None else ", path='{}'".format(self._path))
+
+
+def _numeric_dtype(values):
+    dtype = np.int64
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, Real):
+            return None
+        if not isinstance(value, Integral):
+            dtype = np.float64
+    return dtype
+
+
+def compact_sequences(data, min_length: int = MIN_COMPACT_LENGTH):
+    """
+     Return a copy of the nested mappings in data where lists of at least
+     min_length integers or floats are replaced by NumericSequence objects.
+    """
+    if isinstance(data, Mapping):
+        return {key: compact_sequences(value, min_length) for key, value in data.items()}
+    if isinstance(data, list) and len(data) >= min_length:
+        dtype = _numeric_dtype(data)
+        if dtype is not None:
+            try:
+                return NumericSequence(data, dtype=dtype)
+            except OverflowError:
+                return data
+    return data
+
+
+def expand_sequences(data):
+    """
+     Return a copy of the nested mappings and lists in data where NumericSequence
+     objects are replaced by plain lists.
+    """
+    if isinstance(data, NumericSequence):
+        return data.tolist()
+    if isinstance(data, Mapping):
+        return {key: expand_sequences(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [expand_sequences(value) for value in data]
+    return data
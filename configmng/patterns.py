@@ -0,0 +1,103 @@
+from functools import lru_cache
+import re
+
+
+def _groups(pattern: str):
+    # Split pattern into its top-level parenthesized groups and the text between
+    # them, e.g., "(a)|(b)" into ["", "(a)", "|", "(b)", ""]. Escaped characters
+    # and character classes are skipped. Returns None if parentheses are unbalanced.
+    parts = []
+    depth = 0
+    in_class = False
+    start = 0
+    no = 0
+    while no < len(pattern):
+        char = pattern[no]
+        if char == "\\":
+            no += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+            # A ] right after [ or [^ is a literal.
+            if pattern[no + 1:no + 2] == "]":
+                no += 1
+            elif pattern[no + 1:no + 3] == "^]":
+                no += 2
+        elif char == "(":
+            if depth == 0:
+                parts.append(pattern[start:no])
+                start = no
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0:
+                parts.append(pattern[start:no + 1])
+                start = no + 1
+        no += 1
+    if depth != 0 or in_class:
+        return None
+    parts.append(pattern[start:])
+    return parts
+
+
+def _operands(pattern, operator):
+    # Operands of a pattern built by pattern_union ("(a)|(b)") or pattern_intersection
+    # ("^(?=a$)(?=b$)"), recovered from the pattern itself so that merging is
+    # deterministic. Such patterns written by hand mean the same and are split alike.
+    parts = _groups(pattern)
+    if parts is None or len(parts) < 5:
+        return (pattern,)
+    groups = parts[1::2]
+    separators = parts[0::2]
+    if operator == "union":
+        if separators[0] == "" and separators[-1] == "" and \
+                all(separator == "|" for separator in separators[1:-1]) and \
+                all(not group.startswith("(?") for group in groups):
+            return tuple(group[1:-1] for group in groups)
+    elif separators[0] == "^" and all(separator == "" for separator in separators[1:]) and \
+            all(group.startswith("(?=") and group.endswith("$)") and not group.endswith("\\$)")
+                for group in groups):
+        return tuple(group[3:-2] for group in groups)
+    return (pattern,)
+
+
+def _combine(patterns, operator, template, separator="", prefix=""):
+    operands = []
+    for pattern in patterns:
+        for operand in _operands(pattern, operator):
+            if operand not in operands:
+                operands.append(operand)
+    if len(operands) == 1:
+        return operands[0]
+    return prefix + separator.join(template.format(operand) for operand in operands)
+
+
+@lru_cache(maxsize=4096)
+def pattern_union(*patterns: str) -> str:
+    """
+     Return a pattern matching values matched by any of the patterns. Unions
+     built by this function are flattened and duplicated patterns removed, such
+     that pattern_union(pattern_union(a, b), c) == pattern_union(a, b, c).
+    """
+    return _combine(patterns, "union", "({})", separator="|")
+
+
+@lru_cache(maxsize=4096)
+def pattern_intersection(*patterns: str) -> str:
+    """
+     Return a pattern matching values matched by all of the patterns. As for
+     pattern_union, nested intersections are flattened and deduplicated.
+    """
+    return _combine(patterns, "intersection", "(?={}$)", prefix="^")
+
+
+@lru_cache(maxsize=4096)
+def compile_pattern(pattern: str):
+    """
+     Process-wide cache of compiled regular expressions.
+    """
+    return re.compile(pattern)
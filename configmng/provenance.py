@@ -1,17 +1,69 @@
+import weakref
 import typing
 
+from .journal import ChangeJournal
+
 if typing.TYPE_CHECKING:
     from .config import Config
 
+
+def source_label(config: "Config") -> str:
+    # Configurations that have not been read from a file are labelled by their id.
+    if config._path is not None:
+        return str(config._path)
+    return "<Config {:#x}>".format(id(config))
+
+
+def _dead_reference():
+    # Stands for the references to the sources of an unpickled provenance.
+    return None
+
+
 class ConfigProv:
+    """
+     Provenance of a configuration: the configurations merged into it and the
+     journal of its modifications. Merged configurations are referenced weakly,
+     so that they are not kept alive by the configurations built from them.
+    """
+
+    __slots__ = ("_sources", "journal")
+
+    def __init__(self, journal: typing.Optional[ChangeJournal] = None):
+        self._sources: typing.List[typing.Tuple[str, weakref.ref]] = []
+        self.journal = ChangeJournal() if journal is None else journal
+
+    def merging(self, configs: typing.Iterable["Config"]):
+        for config in configs:
+            self._sources.append((source_label(config), weakref.ref(config)))
+
+    def copy(self) -> "ConfigProv":
+        """
+         Return a provenance with the same sources and an empty journal (which
+         does not spill to the file of this journal).
+        """
+        provenance = ConfigProv(ChangeJournal(self.journal.max_records))
+        provenance._sources = list(self._sources)
+        return provenance
+
+    @property
+    def sources(self) -> typing.List[str]:
+        """
+         Labels (file paths or ids) of the configurations merged, in merging order.
+        """
+        return [label for label, _ in self._sources]
 
-    def __init__(self):
-        self._mergings: typing.List[Config] = []
+    def __getstate__(self):
+        # Weak references cannot be pickled: only the labels of the sources are kept.
+        return [label for label, _ in self._sources], self.journal
 
-    def merging(self, configs : "Config"):
-        self._mergings.append(configs)
+    def __setstate__(self, state):
+        labels, self.journal = state
+        self._sources = [(label, _dead_reference) for label in labels]
 
-    def propagate_changes(self, value, key, path):
-        for merging in self._mergings:
-            for config in merging:
-                config.set_value_at_path(value, key, path, silent_fail=True, only_if_key_in=True)
+    def propagate_changes(self, value, key, path, owner: typing.Optional["Config"] = None):
+        for _, reference in self._sources:
+            config = reference()
+            # Frozen configurations (e.g., of the application level) are static.
+            if config is None or config is owner or config.frozen:
+                continue
+            config.set_value_at_path(value, key, path, silent_fail=True, only_if_key_in=True)
@@ -0,0 +1,191 @@
+from collections import defaultdict
+from collections.abc import Mapping
+from fnmatch import translate
+from functools import lru_cache
+import typing
+
+from .patterns import compile_pattern
+from .references import PathIndex
+from .utils import parse_path
+
+# In query patterns (e.g., "*/log_dir" or "subjects/regex;subject_.*"), keys
+# can be literal keys, glob patterns, "regex;" followed by a regular expression,
+# or ** to match any number of keys.
+ANY_PATH = "**"
+REGEX_PREFIX = "regex;"
+
+
+class _Component:
+
+    __slots__ = ("literal", "regex")
+
+    def __init__(self, key: str):
+        self.literal = None
+        self.regex = None
+        if key.startswith(REGEX_PREFIX):
+            self.regex = compile_pattern(key[len(REGEX_PREFIX):])
+        elif any(char in key for char in "*?["):
+            self.regex = compile_pattern(translate(key))
+        else:
+            self.literal = key
+
+    def match(self, key: str) -> bool:
+        if self.literal is not None:
+            return key == self.literal
+        return self.regex.fullmatch(key) is not None
+
+
+class PathPattern:
+    """
+     Compiled query pattern. Patterns are matched against whole key paths.
+    """
+
+    __slots__ = ("pattern", "components")
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.components = tuple(ANY_PATH if key == ANY_PATH else _Component(key)
+                                for key in parse_path(pattern))
+
+    def match(self, keys: typing.Sequence[str], start: int = 0, offset: int = 0) -> bool:
+        components = self.components
+        while start < len(components):
+            component = components[start]
+            if component is ANY_PATH:
+                return any(self.match(keys, start + 1, no) for no in range(offset, len(keys) + 1))
+            if offset == len(keys) or not component.match(keys[offset]):
+                return False
+            start += 1
+            offset += 1
+        return offset == len(keys)
+
+    @property
+    def last(self):
+        return self.components[-1] if self.components else ANY_PATH
+
+
+@lru_cache(maxsize=1024)
+def compile_query(pattern: str) -> PathPattern:
+    return PathPattern(pattern)
+
+
+class QueryResult:
+
+    __slots__ = ("path", "value", "level", "config_name", "source")
+
+    def __init__(self, path: tuple, value, level: typing.Optional[str] = None,
+                 config_name: typing.Optional[str] = None, source: typing.Optional[str] = None):
+        self.path = path
+        self.value = value
+        self.level = level
+        self.config_name = config_name
+        self.source = source
+
+    def to_json(self):
+        return {"path": "/".join(map(str, self.path)), "value": self.value, "level": self.level,
+                "config_name": self.config_name, "source": self.source}
+
+    def __repr__(self):
+        return "QueryResult({})".format(self.to_json())
+
+
+class QueryIndex:
+    """
+     Index of the key paths of a configuration store (the paths of all the
+     values of its nested mappings), built on the first query. Paths are indexed
+     by prefix and by last key, so that a query only visits the paths ending with
+     a key matching the last key of its pattern. Modified nodes are reindexed
+     through update; a replaced store is reindexed entirely on the next query.
+     Query results are cached until the next modification.
+    """
+
+    __slots__ = ("_store", "_paths", "_by_key", "_results", "updates", "builds")
+
+    def __init__(self):
+        self._store = None
+        self._paths = PathIndex()
+        self._by_key: typing.Dict[str, typing.Set[tuple]] = defaultdict(set)
+        self._results: typing.Dict[tuple, typing.List[tuple]] = {}
+        self.updates = 0
+        self.builds = 0
+
+    def _add(self, node: Mapping, path: tuple):
+        for key, value in node.items():
+            child_path = path + (key,)
+            self._paths.add(child_path)
+            self._by_key[str(key)].add(child_path)
+            if isinstance(value, Mapping):
+                self._add(value, child_path)
+
+    def _remove_under(self, path: tuple):
+        for indexed_path in list(self._paths.under(path)):
+            self._paths.remove(indexed_path)
+            paths = self._by_key[str(indexed_path[-1])]
+            paths.discard(indexed_path)
+            if not paths:
+                del self._by_key[str(indexed_path[-1])]
+
+    def build(self, store: Mapping):
+        self._store = store
+        self._paths = PathIndex()
+        self._by_key = defaultdict(set)
+        self._results = {}
+        self._add(store, ())
+        self.builds += 1
+
+    def update(self, store: Mapping, path: typing.Sequence):
+        """
+         Reindex the node at path of store after it has been modified.
+        """
+        if self._store is not store:
+            return
+        self._results = {}
+        self.updates += 1
+        path = tuple(path)
+        if not path:
+            self.build(store)
+            return
+        self._remove_under(path)
+        # Missing ancestors of path (if any) have just been created.
+        node = store
+        for no, key in enumerate(path):
+            if not isinstance(node, Mapping) or key not in node:
+                return
+            node = node[key]
+            if path[:no + 1] not in self._paths:
+                self._paths.add(path[:no + 1])
+                self._by_key[str(key)].add(path[:no + 1])
+        if isinstance(node, Mapping):
+            self._add(node, path)
+
+    def _candidates(self, pattern: PathPattern) -> typing.Iterable[tuple]:
+        last = pattern.last
+        if last is ANY_PATH:
+            return self._paths.under(())
+        if last.literal is not None:
+            return self._by_key.get(last.literal, ())
+        return [path for key, paths in self._by_key.items() if last.match(key) for path in paths]
+
+    def query(self, store: Mapping, pattern: str, prefix: tuple = ()) -> typing.List[tuple]:
+        """
+         Return the paths of store (sorted) whose concatenation with prefix (e.g.,
+         the insertion node of the configuration) matches pattern.
+        """
+        if self._store is not store:
+            self.build(store)
+        key = (pattern, prefix)
+        paths = self._results.get(key)
+        if paths is None:
+            compiled = compile_query(pattern)
+            str_prefix = tuple(str(key_) for key_ in prefix)
+            paths = sorted((path for path in self._candidates(compiled)
+                            if compiled.match(str_prefix + tuple(str(key_) for key_ in path))),
+                           key=lambda path: tuple(str(key_) for key_ in path))
+            self._results[key] = paths
+        return paths
+
+    @property
+    def stats(self) -> dict:
+        return {"paths": len(self._paths.under(())), "keys": len(self._by_key),
+                "cached_queries": len(self._results), "builds": self.builds,
+                "updates": self.updates}
@@ -0,0 +1,204 @@
+from collections import defaultdict
+from collections.abc import Mapping
+import re
+import typing
+
+from .exceptions import ReferenceCycle, UnresolvedReference
+
+
+# ${a.b.c} refers to the value at path a/b/c of the configuration. $${...} is
+# an escaped, literal ${...}.
+REFERENCE_PATTERN = re.compile(r"\$(\$?)\{([^}]+)\}")
+
+_missing = object()
+
+
+def _normalize(path) -> tuple:
+    return tuple(str(key) for key in path)
+
+
+def parse_reference(reference: str) -> tuple:
+    return tuple(reference.strip().split("."))
+
+
+def find_references(value: str) -> typing.Tuple[tuple, ...]:
+    return tuple(parse_reference(match.group(2)) for match in REFERENCE_PATTERN.finditer(value)
+                 if not match.group(1))
+
+
+class PathIndex:
+    """
+     Set of paths (tuples) indexed by all their prefixes, so that the paths
+     at or under a given path can be retrieved without scanning the set.
+    """
+
+    def __init__(self):
+        self._under = defaultdict(set)
+
+    def add(self, path: tuple):
+        for no in range(len(path) + 1):
+            self._under[path[:no]].add(path)
+
+    def remove(self, path: tuple):
+        for no in range(len(path) + 1):
+            paths = self._under.get(path[:no])
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._under[path[:no]]
+
+    def under(self, path: tuple) -> typing.Set[tuple]:
+        return self._under.get(path, set())
+
+    def __contains__(self, path):
+        return path in self._under.get(path, ())
+
+
+class ReferenceResolver:
+    """
+     Resolves the ${...} references found in the string values of a configuration
+     store. The references are found once, when the resolver is created, and
+     kept as a dependency graph. Each reference is evaluated once and memoized
+     until invalidate is called for a path it depends on, in which case only its
+     dependents are evaluated again.
+
+     A value made of a single reference (e.g., "${paths.root}") resolves to the
+     referenced value, whatever its type. References embedded in a longer string
+     (e.g., "${paths.root}/logs") are interpolated as strings.
+    """
+
+    def __init__(self, store: Mapping):
+        self._store = store
+        # Paths are normalized to tuples of strings.
+        self._references: typing.Dict[tuple, typing.Tuple[tuple, ...]] = {}
+        self._dependents: typing.Dict[tuple, typing.Set[tuple]] = defaultdict(set)
+        self._nodes = PathIndex()
+        self._targets = PathIndex()
+        self._cache: typing.Dict[tuple, typing.Any] = {}
+        self._scan(store, ())
+
+    def _get(self, path):
+        value = self._store
+        for key in path:
+            if isinstance(value, list):
+                value = value[int(key)]
+            elif isinstance(value, Mapping):
+                if key not in value and isinstance(key, str) and key.lstrip("-").isdigit():
+                    key = int(key)
+                value = value[key]
+            else:
+                raise KeyError(key)
+        return value
+
+    def _scan(self, data, path):
+        if isinstance(data, Mapping):
+            for key, value in data.items():
+                self._scan(value, path + (str(key),))
+        elif isinstance(data, list):
+            for no, value in enumerate(data):
+                self._scan(value, path + (str(no),))
+        elif isinstance(data, str) and "${" in data and REFERENCE_PATTERN.search(data):
+            # Values with only escaped references are registered without
+            # targets so that they are unescaped when resolved.
+            self._add_node(path, find_references(data))
+
+    def _add_node(self, path, targets):
+        self._references[path] = targets
+        self._nodes.add(path)
+        for target in targets:
+            if not self._dependents[target]:
+                self._targets.add(target)
+            self._dependents[target].add(path)
+
+    def _remove_node(self, path):
+        for target in self._references.pop(path):
+            self._dependents[target].discard(path)
+            if not self._dependents[target]:
+                del self._dependents[target]
+                self._targets.remove(target)
+        self._nodes.remove(path)
+        self._cache.pop(path, None)
+
+    @property
+    def references(self) -> typing.Dict[tuple, typing.Tuple[tuple, ...]]:
+        return dict(self._references)
+
+    def resolve(self, path: typing.Sequence = ()):
+        """
+         Return the value at path with all its references resolved. Mappings and
+         lists containing references are returned as resolved copies.
+        """
+        return self._resolve(_normalize(path), [])
+
+    def _resolve(self, path, stack):
+        if path in self._references:
+            if path in self._cache:
+                return self._cache[path]
+            if path in stack:
+                raise ReferenceCycle("Cyclic references: {}.".format(
+                    " -> ".join(".".join(node) for node in stack[stack.index(path):] + [path])))
+            stack.append(path)
+            value = self._interpolate(self._get(path), path, stack)
+            stack.pop()
+            self._cache[path] = value
+            return value
+
+        value = self._get(path)
+        if not self._nodes.under(path):
+            return value
+        if isinstance(value, Mapping):
+            return {key: self._resolve(path + (str(key),), stack) for key in value}
+        if isinstance(value, list):
+            return [self._resolve(path + (str(no),), stack) for no in range(len(value))]
+        return value
+
+    def _resolve_target(self, target, path, stack):
+        try:
+            return self._resolve(target, stack)
+        except (KeyError, IndexError, ValueError):
+            raise UnresolvedReference("The reference ${{{}}} in the value at {} cannot be resolved."
+                                      .format(".".join(target), "/".join(path)))
+
+    def _interpolate(self, value: str, path, stack):
+        match = REFERENCE_PATTERN.fullmatch(value)
+        if match is not None and not match.group(1):
+            return self._resolve_target(parse_reference(match.group(2)), path, stack)
+
+        def replace(match):
+            if match.group(1):
+                return match.group(0)[1:]
+            return str(self._resolve_target(parse_reference(match.group(2)), path, stack))
+        return REFERENCE_PATTERN.sub(replace, value)
+
+    def invalidate(self, path: typing.Sequence = ()):
+        """
+         Report that the value at path changed. The references in the new value
+         are registered and the memoized values depending on path are dropped.
+        """
+        path = _normalize(path)
+
+        # Reference nodes at, under, or above the modified path may have been
+        # replaced; they are scanned again.
+        stale_nodes = set(self._nodes.under(path))
+        stale_nodes.update(path[:no] for no in range(len(path)) if path[:no] in self._references)
+        rescan = {path} | {node for node in stale_nodes if len(node) < len(path)}
+        for node in stale_nodes:
+            self._remove_node(node)
+        for node in rescan:
+            try:
+                self._scan(self._get(node), node)
+            except (KeyError, IndexError, ValueError, TypeError):
+                pass
+
+        self._invalidate_dependents(path, set())
+
+    def _invalidate_dependents(self, path, visited):
+        # Nodes referencing path, one of its ancestors, or one of its descendants.
+        targets = set(self._targets.under(path))
+        targets.update(path[:no] for no in range(len(path) + 1) if path[:no] in self._dependents)
+        for target in targets:
+            for node in list(self._dependents.get(target, ())):
+                if node not in visited:
+                    visited.add(node)
+                    self._cache.pop(node, None)
+                    self._invalidate_dependents(node, visited)
@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from pathlib import Path
+import os
+import threading
+import typing
+import weakref
+
+from .config import Config
+from .schema import Schema
+
+
+def _stat_signature(path: Path) -> typing.Tuple[int, int]:
+    stat = os.stat(str(path))
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ConfigRegistry:
+    """
+     Registry of frozen configurations loaded from files, shared by all the
+     objects loading the same file with the same schemas, insertion node and
+     read-only flag. Loaded configurations are frozen, so they can be safely
+     shared, and validated (non-interactively) the first time they are requested
+     with validate=True.
+
+     The max_size most recently used configurations are kept alive by the
+     registry; older ones are only held weakly and are freed when no other
+     object uses them. On every lookup, the file is stat-ed and reloaded if its
+     modification time or size changed.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._recent: "OrderedDict[tuple, Config]" = OrderedDict()
+        self._configs: "weakref.WeakValueDictionary[tuple, Config]" = weakref.WeakValueDictionary()
+        self._signatures: typing.Dict[tuple, typing.Tuple[int, int]] = {}
+        # Keys of the registered configurations that have been validated.
+        self._validated: typing.Set[tuple] = set()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _schemas(schemas) -> typing.List[Schema]:
+        if schemas is None:
+            return []
+        if not isinstance(schemas, list):
+            schemas = [schemas]
+        return [schema if isinstance(schema, Schema) else Schema(schema) for schema in schemas]
+
+    def get(self, path, schemas=None, insertion_node=None, read_only: bool = False,
+            validate: bool = True) -> Config:
+        """
+         Return the frozen configuration loaded from path, loading it if it is not
+         registered or if the file changed since it was loaded.
+
+        :param validate: If true, the configuration is validated unless it already has been.
+        """
+        path = Path(path).resolve()
+        schemas = self._schemas(schemas)
+        key = (str(path), tuple(schema.fingerprint for schema in schemas),
+               None if insertion_node is None else tuple(insertion_node), bool(read_only))
+        signature = _stat_signature(path)
+
+        with self._lock:
+            config = self._configs.get(key)
+            if config is not None and self._signatures.get(key) == signature:
+                self.hits += 1
+                self._touch(key, config)
+                if validate and key not in self._validated:
+                    config.validate(interactive=False)
+                    self._validated.add(key)
+                return config
+            if config is not None:
+                self.reloads += 1
+            else:
+                self.misses += 1
+
+        config = Config(path, schemas=schemas or None, insertion_node=insertion_node,
+                        read_only=read_only, validate=False)
+        if validate:
+            config.validate(interactive=False)
+        config.freeze()
+
+        with self._lock:
+            self._configs[key] = config
+            self._signatures[key] = signature
+            if validate:
+                self._validated.add(key)
+            else:
+                self._validated.discard(key)
+            self._touch(key, config)
+        return config
+
+    def _touch(self, key, config):
+        self._recent[key] = config
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_size:
+            self._recent.popitem(last=False)
+            self.evictions += 1
+        # Forget the signatures of the configurations that have been freed.
+        if len(self._signatures) > 2 * max(len(self._configs), self.max_size):
+            for dead_key in set(self._signatures) - set(self._configs.keys()):
+                del self._signatures[dead_key]
+                self._validated.discard(dead_key)
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+            self._configs.clear()
+            self._signatures.clear()
+            self._validated.clear()
+
+    def __len__(self):
+        return len(self._configs)
+
+    def __contains__(self, path):
+        path = str(Path(path).resolve())
+        return any(key[0] == path for key in self._configs.keys())
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.reloads
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "recent": len(self._recent),
+                "alive": len(self._configs)}
+
+
+# Process-wide registry used by ConfigMng(registry=True).
+default_registry = ConfigRegistry()
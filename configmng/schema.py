@@ -13,15 +13,239 @@ try:
 except ImportError:
     from yaml import Loader, Dumper
 
-from .utils import ConfigMngLoader, eq_mappable, get_node, pretty_print
+from .utils import ConfigMngLoader, eq_mappable, get_node, load_yaml, pretty_print, content_hash
+from .patterns import pattern_union, pattern_intersection
 from .exceptions import NotMergeable, UndefinedScalarMerging, MappingNonMappingMerging, \
     MatchingRuleViolation, UndefinedSequenceMerging
 
 
 string_io_path = Path("<StringIO>")
 
+_not_canonical = object()
+
+
+def canonical_key(item):
+    """
+     Return a hashable key such that two items have equal keys if they compare
+     equal. Lists, tuples, sets and mappings that are not hashable are converted
+     recursively. Returns _not_canonical for items that cannot be converted.
+    """
+    try:
+        hash(item)
+        return item
+    except TypeError:
+        pass
+
+    if isinstance(item, Mapping):
+        items = []
+        for key, value in item.items():
+            value = canonical_key(value)
+            if value is _not_canonical:
+                return _not_canonical
+            items.append((key, value))
+        return Mapping, frozenset(items)
+
+    if isinstance(item, (list, tuple)):
+        items = tuple(canonical_key(value) for value in item)
+        if _not_canonical in items:
+            return _not_canonical
+        return (tuple if isinstance(item, tuple) else list), items
+
+    if isinstance(item, (set, frozenset)):
+        return frozenset, frozenset(item)
+
+    return _not_canonical
+
+
+class ItemSet:
+    """
+     Set of the items of a sequence supporting O(1) membership tests, including
+     for unhashable items such as dicts and lists. Items that cannot be
+     canonicalized fall back on a linear search.
+    """
+
+    def __init__(self, items=()):
+        self._keys = set()
+        self._others = []
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        key = canonical_key(item)
+        if key is _not_canonical:
+            self._others.append(item)
+        else:
+            self._keys.add(key)
+
+    def __contains__(self, item):
+        key = canonical_key(item)
+        if key is _not_canonical:
+            return item in self._others
+        return key in self._keys
+
+
+def _unique_right_extend_left(value1, value2, key):
+    ret_val = copy(value1)
+    value1_items = ItemSet(value1)
+    ret_val.extend([item for item in value2 if item not in value1_items])
+    return ret_val
+
+
+def _unique_left_extend_right(value1, value2, key):
+    return _unique_right_extend_left(value2, value1, key)
+
+
+def _right_extend_left(value1, value2, key):
+    ret_val = copy(value1)
+    ret_val.extend(value2)
+    return ret_val
+
+
+def _left_extend_right(value1, value2, key):
+    return _right_extend_left(value2, value1, key)
+
+
+def _last_dominate(value1, value2, key):
+    return value2
+
+
+def _first_dominate(value1, value2, key):
+    return value1
+
+
+def _identical(value1, value2, key):
+    if value1 == value2:
+        return value1
+    raise MatchingRuleViolation("Values for the '{}' key for corresponding nodes ".format(key) +
+                                "must be identical.")
+
+
+def _raise(value1, value2, key):
+    raise NotMergeable("Values {} and {} cannot be merged for key {}."
+                       .format(value1, value2, key))
+
+
+# Strategies for merging sequences (e.g., enum lists) found at corresponding
+# nodes of two schemas. Left is the sequence of the first schema, right the
+# sequence of the second one.
+sequence_strategies = {
+    "unique_right_extend_left": _unique_right_extend_left,
+    "unique_left_extend_right": _unique_left_extend_right,
+    "right_extend_left": _right_extend_left,
+    "left_extend_right": _left_extend_right,
+    "last_dominate": _last_dominate,
+    "first_dominate": _first_dominate,
+    "identical": _identical,
+    "raise": _raise
+}
+
+
+def _concatenate(value1, value2, key):
+    return "{}_{}".format(value1, value2)
+
+
+def _and(value1, value2, key):
+    return value1 and value2
+
+
+def _or(value1, value2, key):
+    return value1 or value2
+
+
+def _matching_conservative(value1, value2, key):
+    if value1 == "all" or value2 == "all":
+        return "all"
+    if value1 == "any" or value2 == "any":
+        return "any"
+    return "*"
+
+
+def _matching_permissive(value1, value2, key):
+    if value1 == "*" or value2 == "*":
+        return "*"
+    if value1 == "any" or value2 == "any":
+        return "any"
+    return "all"
+
+
+def _matching_rule_conservative(value1, value2, key):
+    if value1 == "all" or value2 == "all":
+        return "all"
+    return "any"
+
+
+def _matching_rule_permissive(value1, value2, key):
+    if value1 == "any" or value2 == "any":
+        return "any"
+    return "all"
+
+
+def _pattern_union(value1, value2, key):
+    return pattern_union(value1, value2)
+
+
+def _pattern_intersection(value1, value2, key):
+    return pattern_intersection(value1, value2)
+
+
+# Rules available for merging the values of schema keys found at corresponding
+# nodes of two schemas. Keys not listed here are merged with one of the
+# default_strategies.
+scalar_rules = {
+    "name": {"concatenate": _concatenate,
+             "left_dominate": _first_dominate,
+             "right_dominate": _last_dominate},
+    "type": {"identical": _identical},
+    "required": {"conservative": _and,
+                 "permissive": _or,
+                 "identical": _identical},
+    "matching": {"conservative": _matching_conservative,
+                 "permissive": _matching_permissive,
+                 "identical": _identical},
+    "matching-rule": {"conservative": _matching_rule_conservative,
+                      "permissive": _matching_rule_permissive,
+                      "identical": _identical},
+    "pattern": {"conservative": _pattern_union,  # union
+                "permissive": _pattern_intersection,  # intersection
+                "identical": _identical},
+    "allowempty": {"conservative": _or,
+                   "permissive": _and,
+                   "identical": _identical},
+}
+
+rule_aliases = {"req": "required"}
+
+default_strategies = {
+    "last_dominate": _last_dominate,
+    "first_dominate": _first_dominate,
+    "identical": _identical,
+    "raise": _raise
+}
+
+
+class ShadowRules(dict):
+    """
+     Rules of a ShadowBehavior. Setting a rule goes through
+     ShadowBehavior.set_rule so that it is validated and compiled.
+    """
+
+    def __init__(self, shadow_behavior: "ShadowBehavior"):
+        super().__init__()
+        self._shadow_behavior = shadow_behavior
+
+    def __setitem__(self, key, rule):
+        self._shadow_behavior.set_rule(key, rule)
+
+    def update(self, *args, **kwargs):
+        for key, rule in dict(*args, **kwargs).items():
+            self[key] = rule
+
 
 class ShadowBehavior:
+
+    __slots__ = ("_merge_functions", "rules_choices", "rules", "_default_shadow_dominance",
+                 "_merge_default", "_sequence_shadow_dominance", "_merge_sequences")
+
     def __init__(self):
 
         """ If equals to "last_dominate", when scalar values are present for
@@ -30,12 +254,21 @@ class ShadowBehavior:
             the value of the first is retained. If equal to "raise", a
             a NotMergeable exception is raised. If equal to "identical", will take
             either values if they are identical, else will raise an exception.
+
+            Each rule is compiled into self._merge_functions, which maps schema
+            keys to the function merging their values.
         """
+        self._merge_functions = {}
+        self.rules_choices = {key: dict(choices) for key, choices in scalar_rules.items()}
+        for alias, aliased in rule_aliases.items():
+            self.rules_choices[alias] = self.rules_choices[aliased]
+        self.rules = ShadowRules(self)
+
         self.default_shadow_dominance = "last_dominate"
 
         self.sequence_shadow_dominance = "unique_right_extend_left"
 
-        self.rules = {
+        self.rules.update({
             "name": "concatenate",
             "type": "identical",
             "required": "conservative",
@@ -43,186 +276,114 @@ class ShadowBehavior:
             "matching-rule": "permissive",
             "pattern": "permissive",
             "allowempty": "permissive"
-        }
-
-        self.rules_choices = {
-            "name": ["concatenate", "left_dominate", "right_dominate"],
-            "type": ["identical"],
-            "required": ["conservative", "permissive", "identical"],
-            "matching": ["conservative", "permissive", "identical"],
-            "matching-rule": ["conservative", "permissive", "identical"],
-            "pattern": ["conservative", "permissive", "identical"],
-            "allowempty": ["conservative", "permissive", "identical"],
-        }
-
-        aliases = [("req", "required")]
-        for alias, aliased in aliases:
-            self.rules[alias] = self.rules[aliased]
-            self.rules_choices[alias] = self.rules_choices[aliased]
+        })
+
+    def register_rule(self, key: str, rule_name: str, function: typing.Callable, use: bool = True):
+        """
+         Make a new rule available for merging the values of a schema key.
+
+        :param key: Schema key (e.g., 'pattern') to which the rule applies.
+        :param rule_name: Name of the rule, to be used with set_rule.
+        :param function: Function taking (value1, value2, key) and returning the merged value.
+        :param use: If true, the rule is also set as the current rule for that key.
+        """
+        key = rule_aliases.get(key, key)
+        self.rules_choices.setdefault(key, {})[rule_name] = function
+        for alias, aliased in rule_aliases.items():
+            if aliased == key:
+                self.rules_choices[alias] = self.rules_choices[key]
+        if use:
+            self.set_rule(key, rule_name)
+
+    def set_rule(self, key: str, rule: typing.Union[str, typing.Callable]):
+        """
+        :param key: Schema key (e.g., 'pattern') to which the rule applies.
+        :param rule: Name of one of the rules available for this key or a function
+                     taking (value1, value2, key) and returning the merged value.
+        """
+        key = rule_aliases.get(key, key)
+        if callable(rule):
+            function = rule
+        elif rule in self.rules_choices.get(key, {}):
+            function = self.rules_choices[key][rule]
+        else:
+            raise ValueError("ShadowBehavior.rules['{}'] can only take ".format(key) +
+                             "values in {}. ".format(list(self.rules_choices.get(key, {}))) +
+                             "It has been set to '{}'.".format(rule))
+
+        keys = [key] + [alias for alias, aliased in rule_aliases.items() if aliased == key]
+        for key in keys:
+            dict.__setitem__(self.rules, key, rule)
+            self._merge_functions[key] = function
+
+    @property
+    def default_shadow_dominance(self):
+        return self._default_shadow_dominance
+
+    @default_shadow_dominance.setter
+    def default_shadow_dominance(self, default_shadow_dominance):
+        if default_shadow_dominance not in default_strategies:
+            raise ValueError("ShadowBehavior.default_shadow_dominance can only take a value in " +
+                             "{}. ".format(list(default_strategies)) +
+                             "It has been set to '{}'.".format(default_shadow_dominance))
+        self._default_shadow_dominance = default_shadow_dominance
+        self._merge_default = default_strategies[default_shadow_dominance]
+
+    @property
+    def sequence_shadow_dominance(self):
+        return self._sequence_shadow_dominance
+
+    @sequence_shadow_dominance.setter
+    def sequence_shadow_dominance(self, sequence_shadow_dominance):
+        if sequence_shadow_dominance not in sequence_strategies:
+            raise ValueError("ShadowBehavior.sequence_shadow_dominance can only take a value in " +
+                             "{}. ".format(list(sequence_strategies)) +
+                             "It has been set to '{}'.".format(sequence_shadow_dominance))
+        self._sequence_shadow_dominance = sequence_shadow_dominance
+        self._merge_sequences = sequence_strategies[sequence_shadow_dominance]
 
     def merge_sequences(self, value1, value2, key):
-        if self.sequence_shadow_dominance == "unique_right_extend_left":
-            ret_val = copy(value1)
-            ret_val.extend([item for item in value2 if item not in value1])
-            return ret_val
-        if self.sequence_shadow_dominance == "unique_right_extend_left":
-            ret_val = copy(value2)
-            ret_val.extend([item for item in value1 if item not in value2])
-            return ret_val
-        if self.sequence_shadow_dominance == "right_extend_left":
-            ret_val = copy(value1)
-            ret_val.extend(value2)
-            return ret_val
-        if self.sequence_shadow_dominance == "right_extend_left":
-            ret_val = copy(value2)
-            ret_val.extend(value1)
-            return ret_val
-        if self.sequence_shadow_dominance == "last_dominate":
-            return value2
-        if self.sequence_shadow_dominance == "first_dominate":
-            return value1
-        if self.sequence_shadow_dominance == "identical":
-            if value1 == value2:
-                return value1
-            raise MatchingRuleViolation("Values for the '{}' key for corresponding nodes ".format(key) +
-                                        "must be identical.")
-        if self.sequence_shadow_dominance == "raise":
-            raise NotMergeable("Values {} and {} cannot be merged for key {}."
-                               .format(value1, value2, key))
-        raise ValueError("ShadowBehavior.default_shadow_dominance can only take" +
-                         "'last_dominate', 'first_dominate', or 'raise' as value." +
-                         "It has been set to '{}'.".format(self.sequence_shadow_dominance))
+        return self._merge_sequences(value1, value2, key)
 
     def merge_scalars(self, value1, value2, key):
-        def raise_error():
-            raise ValueError("ShadowBehavior.rules['{}'] can only take".format(key) +
-                             "values in {}. ".format(self.rules_choices[key]) +
-                             "It has been set to '{}'.".format(self.rules[key]))
-
-        def check_rule_identical():
-            if value1 == value2:
-                return value1
-            raise MatchingRuleViolation("Values for the '{}' key for corresponding nodes ".format(key) +
-                                        "must be identical.")
-
-        if key == "name":
-            if self.rules[key] == "concatenate":
-                return "{}_{}".format(value1, value2)
-            if self.rules[key] == "left_dominate":
-                return value1
-            if self.rules[key] == "right_dominate":
-                return value2
-            raise_error()
-
-        if key == "type":
-            if self.rules[key] == "identical":
-                return check_rule_identical()
-            raise_error()
-
-        if key == "required":
-            if self.rules[key] == "conservative":
-                return value1 and value2
-            if self.rules[key] == "permissive":
-                return value1 or value2
-            if self.rules[key] == "identical":
-                return check_rule_identical()
-            raise_error()
-
-        if key == "matching":
-            if self.rules[key] == "conservative":
-                if value1 == "all" or value2 == "all":
-                    return "all"
-                if value1 == "any" or value2 == "any":
-                    return "any"
-                return "*"
-            if self.rules[key] == "permissive":
-                if value1 == "*" or value2 == "*":
-                    return "*"
-                if value1 == "any" or value2 == "any":
-                    return "any"
-                return "all"
-            if self.rules[key] == "identical":
-                return check_rule_identical()
-            raise_error()
-
-        if key == "matching-rule":
-            if self.rules[key] == "conservative":
-                if value1 == "all" or value2 == "all":
-                    return "all"
-                return "any"
-            if self.rules[key] == "permissive":
-                if value1 == "any" or value2 == "any":
-                    return "any"
-                return "all"
-            if self.rules[key] == "identical":
-                return check_rule_identical()
-            raise_error()
-
-        if key == "pattern":
-            if self.rules[key] == "conservative":  # union
-                return "({})|({})".format(value1, value2)
-            if self.rules[key] == "permissive":  # intersection
-                return "^(?={}$)(?={}$)".format(value1, value2)
-            if self.rules[key] == "identical":
-                return check_rule_identical()
-            raise_error()
-
-        if key == "allowempty":
-            if self.rules[key] == "conservative":
-                return value1 or value2
-            if self.rules[key] == "permissive":
-                return value1 and value2
-            if self.rules[key] == "identical":
-                return check_rule_identical()
-            raise_error()
-
-        if self.default_shadow_dominance == "last_dominate":
-            return value2
-        if self.default_shadow_dominance == "first_dominate":
-            return value1
-        if self.default_shadow_dominance == "identical":
-            return check_rule_identical()
-        if self.default_shadow_dominance == "raise":
-            raise NotMergeable("Values {} and {} cannot be merged for key {}."
-                               .format(value1, value2, key))
-        raise ValueError("ShadowBehavior.default_shadow_dominance can only take" +
-                         "'last_dominate', 'first_dominate', or 'raise' as value." +
-                         "It has been set to '{}'.".format(self.default_shadow_dominance))
+        return self._merge_functions.get(key, self._merge_default)(value1, value2, key)
 
 
 class Schema:
 
+    __slots__ = ("_path", "_data", "_insertion_node", "_fingerprint", "__weakref__")
+
     def __init__(self, schema: "SchemaArg", insertion_node=()):
+        """
+         Schemas are held in memory as parsed data (self._data). Schemas pointing
+         to a file (self._path) are only parsed the first time their data is
+         needed. Data is serialized back to YAML only when saving or when a
+         file-like object is requested (see Schema.schema_io).
+        """
+        self._path: typing.Optional[Path] = None
+        self._data: typing.Optional[dict] = None
+        self._insertion_node: typing.Sequence[str] = insertion_node
+        self._fingerprint: typing.Optional[str] = None
 
         if isinstance(schema, list):
             merged_schema = self.merge_schemas(schema)
-            self._path = merged_schema.path
-            self._schema_io = merged_schema.schema_io
+            self._data = merged_schema._data
             self._insertion_node = merged_schema.insertion_node
             return
 
         if isinstance(schema, io.StringIO):
-            self._path = string_io_path
             try:
-                yaml.load(schema.read(), Loader=ConfigMngLoader)
-                schema.seek(0)
+                self._data = yaml.load(schema.read(), Loader=ConfigMngLoader)
             except:
                 print("Invalid YAML file.")
-            self._schema_io = schema
-            self._insertion_node = insertion_node
             return
 
         if isinstance(schema, MutableMapping):
-            self._path = string_io_path
-            self._schema_io = io.StringIO(yaml.dump(schema, indent=4, sort_keys=True, Dumper=Dumper))
-            self._insertion_node = insertion_node
+            self._data = deepcopy(dict(schema))
             return
 
         if isinstance(schema, (str, Path)):
-            self._path: Path = Path(schema)
-            self._schema_io: typing.Optional[io.StringIO] = None
-            self._insertion_node: typing.Sequence[str] = insertion_node
-
+            self._path = Path(schema)
             if not self._path.exists():
                 raise FileNotFoundError("The schema file {} was not found.".format(self._path))
             return
@@ -240,38 +401,54 @@ class Schema:
         if isinstance(insertion_node, str):
             insertion_node = [insertion_node]
         self._insertion_node = insertion_node
+        self._fingerprint = None
 
     @property
     def path(self) -> Path:
+        if self._path is None:
+            return string_io_path
         return self._path
 
     def set(self, node, value):
         if not isinstance(node, MutableSequence):
             node = [node]
-        schema_data = self.load()
-        if len(node) == 1:
-            schema_data[node[0]] = value
-        else:
-            get_node(schema_data, node[:-1])[node[-1]] = value
-        self._path = string_io_path
-        self._schema_io = io.StringIO(yaml.dump(schema_data, indent=4, sort_keys=True, Dumper=Dumper))
+        schema_data = self._load(normalize=False)
+        get_node(schema_data, node[:-1])[node[-1]] = value
+        # The schema no longer corresponds to the content of its file.
+        self._path = None
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self) -> str:
+        """
+         Hash identifying the schema, computed once and cached. Schemas read from
+         a file are identified by their path and insertion node, other schemas
+         by their (normalized) content.
+        """
+        if self._fingerprint is None:
+            if self._path is not None:
+                self._fingerprint = content_hash(("file", str(self._path.resolve()),
+                                                  tuple(self._insertion_node)))
+            else:
+                self._fingerprint = content_hash(self._load())
+        return self._fingerprint
 
     def __eq__(self, other):
-        if self.path != string_io_path and other.path != string_io_path:
-            return (self._path == other.path and
-                    self.insertion_node == other.insertion_node)
-        else:
-            return self.eq_schema_io(other)
+        if not isinstance(other, Schema):
+            return NotImplemented
+        return self.fingerprint == other.fingerprint
 
+    def __hash__(self):
+        return hash(self.fingerprint)
 
     def eq_schema_io(self, other: "Schema"):
-        return eq_mappable(self.load(), other.load())
+        return eq_mappable(self._load(), other._load())
 
     def pretty_print(self):
-        pretty_print(self.load())
+        pretty_print(self._load())
 
     def to_json(self):
-        return {"path": str(self._path),
+        return {"path": str(self.path),
                 "insertion_node": self._insertion_node}
 
     def __repr__(self):
@@ -285,9 +462,10 @@ class Schema:
 
     def __iadd__(self, other):
         merged_schema = self.merge_schemas([self, other])
-        self._path = merged_schema._path
-        self._schema_io = merged_schema._schema_io
+        self._path = None
+        self._data = merged_schema._data
         self._insertion_node = merged_schema._insertion_node
+        self._fingerprint = None
         return self
 
     @staticmethod
@@ -350,10 +528,12 @@ class Schema:
             if not isinstance(schema, Schema):
                 raise TypeError("schemas must be a list of Schema objects.")
 
-            data_schema = schema.load(normalize=True)
+            # The data of the schemas is not copied since update_schema_data
+            # copies the nodes it inserts in the merged data.
+            data_schema = schema._load(normalize=True)
             if "name" in data_schema:
                 names.append(data_schema["name"])
-                del data_schema["name"]
+                data_schema = {key: value for key, value in data_schema.items() if key != "name"}
             data_schemas.append(data_schema)
 
         if name is None:
@@ -377,61 +557,67 @@ class Schema:
                                  "node {}, but mappings and scalar cannot be ".format(e.keys) +
                                  "merged with one another.")
 
-        return Schema(return_schema_data)
+        return Schema.from_data(return_schema_data)
+
+    @staticmethod
+    def from_data(data: dict) -> "Schema":
+        """
+         Make an in-memory schema holding data without copying it, contrary to
+         Schema(data). The caller must not modify data afterward.
+        """
+        schema = Schema({})
+        schema._data = data
+        return schema
 
     @property
     def schema_io(self):
-        if self._path != string_io_path:
-            self.make_file_object()
-        return self._schema_io
+        return io.StringIO(yaml.dump(self._load(normalize=False), indent=4, sort_keys=True, Dumper=Dumper))
 
     def make_file_object(self):
-        if self._path == string_io_path:
-            return
-
-        self._schema_io = io.StringIO(self._path.read_text())
-        self._path = string_io_path
+        # Kept for backward compatibility. Schemas are now always held in memory
+        # once loaded; this detaches the schema from its file.
+        self._load(normalize=False)
+        self._path = None
+        self._fingerprint = None
 
     def save(self, path):
-        if self._path != string_io_path:
+        if self._path is not None:
             warn("The schema is already a save file {} on the disk. Doing nothing.".format(self._path))
             return
 
-        self._path = Path(path)
-        self._path.write_text(self._schema_io.read())
-        self._schema_io = None
+        path = Path(path)
+        path.write_text(yaml.dump(self._load(normalize=False), indent=4, sort_keys=True, Dumper=Dumper))
+        self._path = path
+        self._fingerprint = None
 
     def normalize(self):
-        yaml_str = yaml.dump(self.load(normalize=True), indent=4, sort_keys=True, Dumper=Dumper)
+        self._data = self._load(normalize=True)
         self._insertion_node = ()
-        self._path = string_io_path
-        self._schema_io = io.StringIO(yaml_str)
-
-    def load(self, normalize=True):
-        if self._path == string_io_path and self._schema_io is not None:
-            schema_data = yaml.load(self._schema_io.read(), Loader=ConfigMngLoader)
-            self._schema_io.seek(0)
-        elif self._path != string_io_path and self._schema_io is None:
-            schema_data = yaml.load(self._path.read_text(), Loader=ConfigMngLoader)
-        else:
-            raise RuntimeError("This Schema object is in an unexpected state.\n" +
-                               "self._path: {}\n".format(self._path) +
-                               "self._schema_io: {}".format(self._schema_io))
+        self._path = None
+        self._fingerprint = None
+
+    def _load(self, normalize=True):
+        # Return the schema data without copying it. Callers must not modify
+        # the returned data unless they mean to modify the schema.
+        if self._data is None:
+            if self._path is None:
+                raise RuntimeError("This Schema object does not hold any valid schema data.")
+            self._data = load_yaml(self._path)
 
         if not normalize or len(self._insertion_node) == 0:
-            return schema_data
+            return self._data
 
         normalized_schema_data = {}
+        schema_data = self._data
         if "name" in schema_data:
             normalized_schema_data["name"] = schema_data["name"]
-            del schema_data["name"]
+            schema_data = {key: value for key, value in schema_data.items() if key != "name"}
 
         last_mapping = None
         node = None
         current_node = normalized_schema_data
         for node in self._insertion_node:
             current_node["type"] = "map"
-            current_node["mapping"] = node
             current_node["mapping"] = {}
             current_node["mapping"][node] = {}
             last_mapping = current_node["mapping"]
@@ -441,6 +627,16 @@ class Schema:
 
         return normalized_schema_data
 
+    def load(self, normalize=True, copy=True):
+        """
+        :param normalize: If true, the schema is nested within its insertion node.
+        :param copy: If false, the data held by the schema is returned without being
+                     copied and must not be modified.
+        """
+        if copy:
+            return deepcopy(self._load(normalize))
+        return self._load(normalize)
+
 
 ScalarSchemaArg = typing.TypeVar('ScalarSchemaArg', MutableMapping, io.StringIO, str, Path, Schema)
 SchemaArg = typing.Union[ScalarSchemaArg, typing.Sequence[ScalarSchemaArg]]
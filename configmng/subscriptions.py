@@ -0,0 +1,145 @@
+import typing
+
+
+# In subscription patterns (e.g., "resources/*/size"), * matches any single key
+# and a trailing ** matches any path under the preceding keys.
+ANY_KEY = "*"
+ANY_PATH = "**"
+
+
+def parse_pattern(pattern) -> tuple:
+    if isinstance(pattern, str):
+        pattern = pattern.split("/")
+    keys = tuple(str(key) for key in pattern if key != "")
+    if ANY_PATH in keys[:-1]:
+        raise ValueError("** can only be used as the last key of a subscription pattern. "
+                         "Received {}.".format(pattern))
+    return keys
+
+
+class Subscription:
+
+    __slots__ = ("pattern", "callback", "all_paths", "_trie", "_node")
+
+    def __init__(self, pattern: tuple, callback: typing.Callable, trie, node, all_paths: bool = False):
+        self.pattern = pattern
+        self.callback = callback
+        self.all_paths = all_paths
+        self._trie = trie
+        self._node = node
+
+    @property
+    def active(self) -> bool:
+        return self._node is not None
+
+    def cancel(self):
+        if self._node is not None:
+            self._trie.remove(self)
+
+    def __repr__(self):
+        return "Subscription({!r})".format("/".join(self.pattern))
+
+
+class _TrieNode:
+
+    __slots__ = ("children", "subscriptions", "_subtree")
+
+    def __init__(self):
+        self.children: typing.Dict[str, _TrieNode] = {}
+        self.subscriptions: typing.List[Subscription] = []
+        # Subscriptions of this node and of its descendants, computed on demand.
+        self._subtree: typing.Optional[typing.List[Subscription]] = None
+
+    def subtree(self) -> typing.List[Subscription]:
+        if self._subtree is None:
+            self._subtree = list(self.subscriptions)
+            for child in self.children.values():
+                self._subtree.extend(child.subtree())
+        return self._subtree
+
+
+class SubscriptionTrie:
+    """
+     Subscriptions indexed by the keys of their patterns. Finding the subscriptions
+     matching a modified path walks the trie along that path, so that its cost
+     depends on the depth of the path (and the number of matches) but not on the
+     number of subscriptions.
+
+     A modification at a path matches the subscriptions whose pattern matches that
+     path, one of its ancestors (the subscribed node contains the modified one), or
+     one of its descendants (the subscribed node has been replaced).
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def add(self, pattern, callback: typing.Callable, all_paths: bool = False) -> Subscription:
+        keys = parse_pattern(pattern)
+        node = self._root
+        node._subtree = None
+        for key in keys:
+            node = node.children.setdefault(key, _TrieNode())
+            node._subtree = None
+        subscription = Subscription(keys, callback, self, node, all_paths)
+        node.subscriptions.append(subscription)
+        return subscription
+
+    def remove(self, subscription: Subscription):
+        nodes = [self._root]
+        for key in subscription.pattern:
+            nodes.append(nodes[-1].children[key])
+        nodes[-1].subscriptions.remove(subscription)
+        subscription._node = None
+        for node in nodes:
+            node._subtree = None
+        # Prune the branches left without subscriptions.
+        for no in range(len(nodes) - 1, 0, -1):
+            if nodes[no].subscriptions or nodes[no].children:
+                break
+            del nodes[no - 1].children[subscription.pattern[no - 1]]
+
+    def __len__(self):
+        return len(self._root.subtree())
+
+    def match(self, path: typing.Sequence) -> typing.List[Subscription]:
+        matches = {}
+        nodes = [self._root]
+        for key in path:
+            key = str(key)
+            next_nodes = []
+            for node in nodes:
+                for subscription in node.subscriptions:
+                    matches.setdefault(id(subscription), subscription)
+                any_path = node.children.get(ANY_PATH)
+                if any_path is not None:
+                    for subscription in any_path.subscriptions:
+                        matches.setdefault(id(subscription), subscription)
+                for child_key in (key, ANY_KEY):
+                    child = node.children.get(child_key)
+                    if child is not None:
+                        next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                break
+        else:
+            for node in nodes:
+                for subscription in node.subtree():
+                    matches.setdefault(id(subscription), subscription)
+        return list(matches.values())
+
+    def dispatch(self, config, paths: typing.Iterable[typing.Sequence]):
+        """
+         Call, once, each subscription matching any of paths with config and the
+         first matching path, or the list of all the matching paths for the
+         subscriptions made with all_paths.
+        """
+        calls = {}
+        for path in paths:
+            for subscription in self.match(path):
+                calls.setdefault(id(subscription), (subscription, []))[1].append(tuple(path))
+        for subscription, matched in calls.values():
+            # A callback can cancel the subscriptions still to be called.
+            if subscription.active:
+                subscription.callback(config, matched if subscription.all_paths else matched[0])
@@ -1,6 +1,12 @@
 from pathlib import Path
+import multiprocessing
+import os
+
+import pytest
+from pykwalify.errors import SchemaError
 
 from configmng import Config, Schema
+from configmng.utils import content_hash
 
 
 def test__init__():
@@ -89,4 +95,234 @@ def test_add_dublon_schema():
     config.add_schemas(path_schema)
     assert(len(config.schemas) == 1)
     config.add_schemas(Schema(""))
-    assert(len(config.schemas) == 2)
\ No newline at end of file
+    assert(len(config.schemas) == 2)
+    config.add_schemas([Schema({"type": "map"}), Schema({"type": "map"})])
+    assert(len(config.schemas) == 3)
+
+
+def test_fingerprint():
+    config1 = Config({"a": {"b": {"c": 1}, "d": [1, 2]}, "e": "value"})
+    config2 = Config({"e": "value", "a": {"d": [1, 2], "b": {"c": 1}}})
+    assert(config1.fingerprint() == config2.fingerprint())
+    assert(config1.fingerprint(["a", "b"]) == content_hash({"c": 1}))
+
+    fingerprint_d = config1.fingerprint(["a", "d"])
+    config1.set_value_at_path(2, "c", ["a", "b"])
+    assert(config1.fingerprint() != config2.fingerprint())
+    assert(config1.fingerprint(["a", "d"]) == fingerprint_d)
+    assert(config1.fingerprint() == content_hash(config1.store))
+
+    config1.update({"a": {"b": {"c": 1}}}, validate=False)
+    assert(config1.fingerprint() == config2.fingerprint())
+
+    config1["e"] = "other"
+    assert(config1.fingerprint() == content_hash(config1.store))
+    del config1["e"]
+    assert(config1.fingerprint() == content_hash(config1.store))
+
+
+def test_transaction(tmp_path, monkeypatch):
+    schema = Schema({"type": "map", "mapping": {"a": {"type": "map", "mapping": {
+        "b": {"type": "int"}, "c": {"type": "int"}}}, "d": {"type": "str"}}})
+    config = Config({"a": {"b": 1}, "d": "value"}, schemas=schema)
+    path = tmp_path / "config.yaml"
+    path.touch()
+    config.save(path)
+
+    validations = []
+    revalidate = Config.revalidate
+    monkeypatch.setattr(Config, "revalidate", lambda self, *args, **kwargs:
+                        validations.append(1) or revalidate(self, *args, **kwargs))
+    with config.transaction(save=True):
+        for no in range(10):
+            config.update({"a": {"c": no}})
+        config["d"] = "other"
+        config.set_value_at_path(2, "b", ["a"])
+    assert(len(validations) == 1)
+    assert(config.store == {"a": {"b": 2, "c": 9}, "d": "other"})
+    assert(Config(path).store == config.store)
+
+    with pytest.raises(SchemaError):
+        with config.transaction():
+            config.update({"a": {"b": "not an int", "e": 1}})
+            del config["d"]
+    assert(config.store == {"a": {"b": 2, "c": 9}, "d": "other"})
+    assert(config.fingerprint() == content_hash(config.store))
+
+
+def test_revalidate(monkeypatch):
+    schema = Schema({"type": "map", "mapping": {"regex;(section_.+)": {"type": "map", "mapping": {
+        "regex;(key_.+)": {"type": "int"}}}}})
+    config = Config({"section_{}".format(i): {"key_{}".format(j): j for j in range(10)} for i in range(10)},
+                    schemas=schema)
+    config["section_0"]["key_0"] = 10
+    config.mark_changed(["section_0", "key_0"])
+    config.set_value_at_path(11, "key_1", ["section_1"])
+    config.set_value_at_path(12, "key_2", ["section_1"])
+    assert(sorted(config.changed_paths) == [("section_0", "key_0"), ("section_1", "key_1"),
+                                           ("section_1", "key_2")])
+
+    validations = []
+    monkeypatch.setattr(Config, "validate", lambda self, *args, **kwargs: validations.append(1))
+    config.revalidate()
+    assert(len(validations) == 0 and config.changed_paths == [])
+
+    config.set_value_at_path("not an int", "key_2", ["section_1"])
+    config.revalidate()
+    assert(len(validations) == 1)
+
+
+def test_frozen():
+    config = Config({"a": {"b": [1, 2]}, "c": "value"}, frozen=True)
+    assert(config.frozen and config.store == {"a": {"b": [1, 2]}, "c": "value"})
+    assert(hash(config) == hash(Config({"c": "value", "a": {"b": [1, 2]}}, frozen=True)))
+    assert(len({config, Config(dict(config.store), frozen=True)}) == 1)
+    with pytest.raises(TypeError):
+        config["c"] = "other"
+    with pytest.raises(TypeError):
+        config.set_value_at_path(3, "b", ["a"])
+    with pytest.raises(TypeError):
+        config.update({"a": {"d": 1}})
+    with pytest.raises(TypeError):
+        hash(Config({"c": "value"}))
+
+    # Merges share the nodes of frozen configurations instead of copying them.
+    merged = Config({"e": 1}) + config
+    assert(merged.store["a"] is config.store["a"])
+    merged.set_value_at_path(3, "b", ["a"])
+    assert(config["a"]["b"] == [1, 2])
+
+    copy = Config(config)
+    assert(not copy.frozen and copy.store["a"] is config.store["a"])
+
+
+def test_compact_layout():
+    config = Config({"a": 1})
+    assert(not hasattr(config, "__dict__"))
+    assert(not hasattr(Schema({"type": "any"}), "__dict__"))
+    # Optional members are only created when needed.
+    assert(config._tmp_file is None and config._fingerprints is None and config._provenance is None)
+    assert(config.path.exists() and config._tmp_file is not None)
+
+
+def _concurrent_writer(path, writer_no, n_saves):
+    for save_no in range(n_saves):
+        config = Config(path)
+        config["writer_{}_{}".format(writer_no, save_no)] = save_no
+        config.set_value_at_path(writer_no, "last_writer", ["shared"])
+        config.save()
+
+
+def test_concurrent_save(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("shared:\n  key: value\n")
+    n_writers, n_saves = 8, 10
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_concurrent_writer, args=(str(path), no, n_saves))
+                 for no in range(n_writers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert(process.exitcode == 0)
+
+    # No write has been lost nor corrupted the file.
+    config = Config(path)
+    assert(len(config) == n_writers * n_saves + 1)
+    assert(config["shared"]["key"] == "value")
+    assert(config["shared"]["last_writer"] in range(n_writers))
+    assert(list(tmp_path.iterdir()) == [path])
+
+
+def test_save_merge(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("a: 1\nb: {c: 2}\n")
+    config1 = Config(path)
+    config2 = Config(path)
+    config1["a"] = 10
+    config1.save()
+    config2.set_value_at_path(20, "c", ["b"])
+    config2.save()
+    assert(Config(path).store == {"a": 10, "b": {"c": 20}})
+    assert(config2.store == {"a": 10, "b": {"c": 20}})
+
+    # Unchanged configurations are not written.
+    mtime = path.stat().st_mtime_ns
+    os.utime(str(path), ns=(0, 0))
+    config2.save()
+    assert(path.stat().st_mtime_ns == 0 and mtime != 0)
+
+    # Nested mappings modified in place are saved, and not merged since their
+    # paths are unknown.
+    config2.save()
+    config2["b"]["c"] = 30
+    config2.save()
+    assert(Config(path).store == {"a": 10, "b": {"c": 30}})
+    config1["b"]["c"] = 40
+    config1.save()
+    assert(Config(path).store == {"a": 10, "b": {"c": 40}})
+    config1["a"] = 50
+    config2.set_value_at_path(60, "c", ["b"])
+    config1.save()
+    config2.save()
+    assert(Config(path).store == {"a": 50, "b": {"c": 60}})
+
+
+def test_subscribe():
+    config = Config({"paths": {"root": "/root", "log_dir": "/logs"},
+                     "resources": {"cpu": {"size": 1}, "gpu": {"size": 0}}})
+    calls = []
+    config.subscribe("paths/root", lambda config, path: calls.append(("root", path)))
+    config.subscribe("resources/*/size", lambda config, path: calls.append(("size", path)))
+    subscription = config.subscribe("**", lambda config, path: calls.append(("all", path)))
+
+    config["other"] = 1
+    assert(calls == [("all", ("other",))])
+    subscription.cancel()
+    assert(not subscription.active)
+
+    calls.clear()
+    config.set_value_at_path("/tmp", "log_dir", ["paths"])
+    config.update({"resources": {"gpu": {"size": 2}}})
+    assert(calls == [("size", ("resources", "gpu", "size"))])
+
+    # Replacing an ancestor notifies the subscribers of its descendants.
+    calls.clear()
+    config["paths"] = {"root": "/other"}
+    config += Config({"resources": {"cpu": {"size": 4}}})
+    assert(calls == [("root", ("paths",)), ("size", ("resources", "cpu", "size"))])
+
+    batches = []
+    config.subscribe("resources", lambda config, paths: batches.append(paths), all_paths=True)
+    config.update({"resources": {"cpu": {"size": 8}, "gpu": {"size": 8}}})
+    assert(batches == [[("resources", "cpu", "size"), ("resources", "gpu", "size")]])
+
+    with pytest.raises(ValueError):
+        config.subscribe("**/size", print)
+
+
+def test_path_accessors(capsys):
+    config = Config({"paths": {"root": "/root"}, "jobs": [{"name": "job_0"}]})
+    assert(config.get("paths/root") == "/root")
+    assert(config.get(("paths", "root")) == "/root")
+    assert(config.get("jobs/0/name") == "job_0")
+    assert(config.get("paths/missing", "default") == "default")
+    assert(config.get("paths/root/missing") is None)
+    assert(config.get("paths") == {"root": "/root"})
+    assert(capsys.readouterr().out == "")
+
+    config.set("paths/root", "/other")
+    config.set("resources/cpu/size", 4)
+    assert(config.get_many(["paths/root", "resources/cpu/size", "missing"], 0) == ["/other", 4, 0])
+    with pytest.raises(ValueError):
+        config.set("", 1)
+
+    # Digit keys index sequences, which are not replaced by mappings.
+    config.set("jobs/0/name", "job_1")
+    config.set("jobs/0/resources/cpu", 2)
+    assert(config["jobs"] == [{"name": "job_1", "resources": {"cpu": 2}}])
+    with pytest.raises(IndexError):
+        config.set("jobs/1/name", "job_2")
+    with pytest.raises(TypeError):
+        config.set("paths/root/name", "root")
+    assert(config.get("paths/root") == "/other")
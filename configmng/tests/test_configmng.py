@@ -1,5 +1,10 @@
+import pickle
 
-from configmng import ConfigMng, Config
+
+import pytest
+from configmng import ConfigMng, ConfigLevel, Config, Schema
+from configmng.cache import ConfigCache
+from configmng.exceptions import StaleBundle
 
 
 def test__init__():
@@ -39,3 +44,179 @@ def test_config_levels():
     assert("test_user" in mng1.config)
     assert("test_application" in mng1.config)
     assert(len(mng1.config) == 4)
+
+
+def test_cache(tmp_path, monkeypatch):
+    cache = ConfigCache(tmp_path / "cache.sqlite")
+    schema = Schema({"type": "map", "mapping": {"paths": {"type": "map", "mapping": {
+        "root": {"type": "str"}, "log_dir": {"type": "str"}}}}})
+    application_config = Config({"paths": {"root": "/root"}}, schemas=schema)
+    user_config = tmp_path / "user.yaml"
+    user_config.write_text("paths:\n  log_dir: /logs\n")
+
+    mng1 = ConfigMng(user_configs=str(user_config), application_configs=application_config, cache=cache)
+    assert(cache.stats["misses"] == 1 and cache.stats["entries"] == 1)
+
+    validations = []
+    monkeypatch.setattr("configmng.config.ConfigCore", lambda *args, **kwargs: validations.append(args))
+    mng2 = ConfigMng(user_configs=str(user_config), application_configs=application_config,
+                     cache=tmp_path / "cache.sqlite")
+    assert(mng2.cache.stats["hits"] == 1)
+    assert(len(validations) == 0)
+    assert(mng2.config == mng1.config)
+    assert(mng2.config.schemas == [schema])
+    monkeypatch.undo()
+
+    user_config.write_text("paths:\n  log_dir: /other_logs\n")
+    mng3 = ConfigMng(user_configs=str(user_config), application_configs=application_config, cache=cache)
+    assert(cache.stats["misses"] == 2)
+    assert(mng3.config["paths"]["log_dir"] == "/other_logs")
+
+    # Nested mappings modified in place are not hidden by a cache hit.
+    user_config = Config({"paths": {"log_dir": "/logs"}}, validate=False)
+    user_config.fingerprint()
+    mng4 = ConfigMng(user_configs=user_config, application_configs=application_config, cache=cache)
+    user_config["paths"]["log_dir"] = "/other_logs"
+    mng4.set_level_configs(None)
+    assert(mng4.config["paths"]["log_dir"] == "/other_logs")
+
+
+def test_bundle(tmp_path, monkeypatch):
+    schema_path = tmp_path / "schema.yaml"
+    schema_path.write_text("type: map\nmapping:\n  paths:\n    type: map\n    mapping:\n"
+                           "      root: {type: str}\n      log_dir: {type: str}\n")
+    user_config = tmp_path / "user.yaml"
+    user_config.write_text("paths:\n  log_dir: /logs\n")
+    mng = ConfigMng(user_configs=Config(user_config, schemas=schema_path),
+                    application_configs={"paths": {"root": "/root", "log_dir": "/app_logs"}})
+    bundle_path = tmp_path / "config.bundle"
+    mng.compile(bundle_path)
+    # No temporary file is created for the configurations not read from a file.
+    assert(mng.get_level("application").get_configs()[0]._tmp_file is None)
+
+    monkeypatch.setattr("configmng.config.ConfigCore", None)
+    monkeypatch.setattr("configmng.utils.load_yaml", None)
+    bundled_mng = ConfigMng.from_bundle(bundle_path)
+    assert(bundled_mng.config == mng.config)
+    assert(bundled_mng.config.schemas[0].load() == mng.config.merged_schema().load())
+    assert(bundled_mng.key_provenance() == {("paths", "root"): ("application", "conf_0"),
+                                            ("paths", "log_dir"): ("user", "conf_0")})
+    monkeypatch.undo()
+
+    user_config.write_text("paths:\n  log_dir: /other_logs\n")
+    with pytest.raises(StaleBundle):
+        ConfigMng.from_bundle(bundle_path)
+    assert(ConfigMng.from_bundle(bundle_path, check_stale=False).config["paths"]["log_dir"] == "/logs")
+
+
+def test_transaction(monkeypatch):
+    mng = ConfigMng(application_configs={"paths": {"root": "/root"}})
+    validations = []
+    validate = ConfigMng.validate
+    monkeypatch.setattr(ConfigMng, "validate", lambda self, *args, **kwargs:
+                        validations.append(1) or validate(self, *args, **kwargs))
+    with mng.transaction():
+        for no in range(5):
+            mng.add_config({"key_{}".format(no): no}, "user")
+    assert(len(validations) == 1)
+    assert(mng.config["key_4"] == 4)
+
+    config = mng.config
+    with pytest.raises(RuntimeError):
+        with mng.transaction():
+            mng.add_config({"other_key": 1}, "instance")
+            raise RuntimeError
+    assert(mng.config is config)
+    assert(len(mng.get_level("instance").get_configs()) == 0)
+
+    # Modifications of the merged configuration are rolled back too.
+    with pytest.raises(RuntimeError):
+        with mng.transaction():
+            mng.config["key_0"] = "modified"
+            mng.config.update({"new_key": 1}, validate=False)
+            raise RuntimeError
+    assert(mng.config["key_0"] == 0 and "new_key" not in mng.config)
+
+    # Levels do not validate eagerly in the block; validation happens once on exit.
+    level_validations = []
+    monkeypatch.setattr(ConfigLevel, "validate", lambda self, *args, **kwargs:
+                        level_validations.append(1))
+    schema = Schema({"type": "map", "mapping": {"regex;(.+)": {"type": "any"}}})
+    validations.clear()
+    with mng.transaction():
+        mng.set_level_schemas("user", [schema])
+        mng.set_level_schemas("instance", [schema])
+    assert(level_validations == [] and len(validations) == 1)
+    assert(mng.get_level("user").validation_policy == "eager")
+
+
+@pytest.mark.parametrize("policy,expected", [("eager", 5), ("deferred", 1), ("on_save", 1), ("explicit", 0)])
+def test_validation_policy(tmp_path, policy, expected):
+    schema = Schema({"type": "map", "mapping": {"regex;(key_.+)": {"type": "int"}}})
+    mng = ConfigMng(validation_policy=policy)
+    for no in range(5):
+        mng.add_config(Config({"key_{}".format(no): no}, schemas=schema), "user")
+    assert(mng.validation_stats["pending"] == (policy != "eager"))
+
+    mng.config
+    save_path = tmp_path / "config.yaml"
+    save_path.touch()
+    mng.save_config(save_path)
+    mng.config
+    assert(mng.validation_count == expected)
+
+    with pytest.raises(ValueError):
+        mng.validation_policy = "sometimes"
+
+
+def test_frozen_application_level():
+    mng = ConfigMng(application_configs={"paths": {"root": "/root"}, "plugins": {"a": {"b": 1}}},
+                    user_configs={"paths": {"log_dir": "/logs"}})
+    application_config = mng.get_level("application").get_configs()[0]
+    assert(application_config.frozen)
+    assert(not mng.get_level("user").get_configs()[0].frozen)
+    assert(mng.config["paths"] == {"root": "/root", "log_dir": "/logs"})
+
+    # The merged configuration can be modified without modifying the frozen one.
+    mng.config["paths"]["root"] = "/new"
+    assert(mng.config["paths"]["root"] == "/new")
+    assert(application_config["paths"]["root"] == "/root")
+    # Only the nodes reached are copied.
+    mng.config["plugins"]["c"] = 2
+    assert(mng.config["plugins"]["a"] is application_config["plugins"]["a"])
+
+    mng = ConfigMng(application_configs={"paths": {"root": "/root"}})
+    mng.config["x"] = 1
+    mng.config.update({"paths": {"log_dir": "/logs"}}, validate=False)
+    assert(mng.config["paths"] == {"root": "/root", "log_dir": "/logs"})
+    assert(mng.get_level("application").get_configs()[0].store == {"paths": {"root": "/root"}})
+
+
+def test_subscribe():
+    mng = ConfigMng(application_configs={"paths": {"root": "/root", "log_dir": "/logs"}})
+    calls = []
+    mng.subscribe("paths/log_dir", lambda config, path: calls.append((config, path)))
+    mng.add_config({"paths": {"root": "/other_root"}}, "user")
+    assert(calls == [])
+    mng.add_config({"paths": {"log_dir": "/other_logs"}}, "instance")
+    assert(calls == [(mng.config, ("paths", "log_dir"))])
+    mng.config["paths"] = {}
+    assert(len(calls) == 2 and calls[1][1] == ("paths",))
+
+    # All the paths of a multi-key update are forwarded.
+    mng.subscribe("paths/root", lambda config, path: calls.append((config, path)))
+    mng.config.update({"paths": {"log_dir": "/a", "root": "/b"}}, validate=False)
+    assert([path for _, path in calls[2:]] == [("paths", "log_dir"), ("paths", "root")])
+
+
+def test_pickle():
+    mng = ConfigMng(application_configs={"paths": {"root": "/root"}},
+                    user_configs={"job": 1}, instance_configs={"name": "a"})
+    mng.config["job"] = 2
+    mng.make_serializable()
+    copy = pickle.loads(pickle.dumps(mng))
+    assert(copy.config.store == mng.config.store)
+    assert(copy.config.provenance.sources == mng.config.provenance.sources)
+    assert([record.new for record in copy.config.journal.history(["job"])] == [2])
+    copy.config["job"] = 3
+    assert(copy.config.journal.history(["job"])[-1].old == 2)
@@ -0,0 +1,49 @@
+from configmng import Config, ConfigMng
+from configmng.diff import diff_stores
+
+
+def test_diff():
+    config1 = Config({"a": {"b": 1, "c": [1, 2]}, "d": "value", "e": {"f": 1}})
+    config2 = Config({"a": {"b": 2, "c": [1, 2]}, "e": {"f": True}, "g": {"h": 1}})
+    diff = config1.diff(config2)
+    assert(diff.changed == {("a", "b"): (1, 2), ("e", "f"): (1, True)})
+    assert(diff.removed == {("d",): "value"})
+    assert(diff.added == {("g",): {"h": 1}})
+    assert(len(diff) == 4 and not config1.diff(Config(config1)))
+    assert(diff.to_json()["changed"]["a/b"] == {"old": 1, "new": 2})
+
+
+def test_short_circuit():
+    class Unequal(dict):
+        def __eq__(self, other):
+            raise AssertionError("Identical subtrees should not be compared.")
+
+    shared = Unequal(b=1)
+    assert(not diff_stores({"a": shared}, {"a": shared}))
+
+    config1 = Config({"a": {"b": 1}, "c": 1})
+    config2 = Config({"a": {"b": 1}, "c": 2})
+    config1.intern()
+    config2.intern()
+    assert(config1.store["a"] is config2.store["a"])
+    assert(list(config1.diff(config2).changed) == [("c",)])
+
+    # Cached fingerprints, which do not see nested mappings modified in place,
+    # are not used.
+    config3 = Config({"a": {"b": 1}, "c": 1})
+    config4 = Config({"a": {"b": 1}, "c": 1})
+    config3.fingerprint()
+    config4.fingerprint()
+    config4["a"]["b"] = 2
+    assert(config3.diff(config4).changed == {("a", "b"): (1, 2)})
+
+
+def test_diff_levels():
+    mng = ConfigMng(application_configs={"paths": {"root": "/root", "log_dir": "/logs"}},
+                    instance_configs={"paths": {"log_dir": "/other_logs"}, "job": 1})
+    diffs = mng.diff_levels()
+    assert(list(diffs) == ["application", "project", "user", "instance"])
+    assert(diffs["application"].added == {("paths",): {"root": "/root", "log_dir": "/logs"}})
+    assert(not diffs["user"])
+    assert(diffs["instance"].changed == {("paths", "log_dir"): ("/logs", "/other_logs")})
+    assert(diffs["instance"].added == {("job",): 1})
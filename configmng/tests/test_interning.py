@@ -0,0 +1,85 @@
+import copy
+import pickle
+
+import pytest
+
+from configmng import Config, ConfigMng
+from configmng.frozen import FrozenDict, FrozenList
+from configmng.interning import InternPool, memory_report
+from configmng.utils import content_hash
+
+
+def get_store(instance):
+    return {"application": {"name": "app", "plugins": [{"name": "a"}, {"name": "b"}]},
+            "user": {"name": "user", "emails": ["user@example.com"]},
+            "instance": {"job": instance}}
+
+
+def test_intern():
+    pool = InternPool()
+    configs = [Config(get_store(no)) for no in range(10)]
+    before = memory_report(configs)
+    for config in configs:
+        config.intern(pool)
+    after = memory_report(configs)
+    assert(after["nodes"] == before["nodes"])
+    assert(after["unique_nodes"] < before["unique_nodes"])
+    assert(after["dedup_ratio"] > 2)
+    assert(configs[0]["application"] is configs[9]["application"])
+    assert(configs[0]["instance"] is not configs[9]["instance"])
+    assert(pool.stats["dedup_ratio"] > 1)
+
+    store = configs[0]["application"]
+    assert(isinstance(store, FrozenDict) and isinstance(store["plugins"], FrozenList))
+    assert(store == get_store(0)["application"])
+    assert(copy.deepcopy(store) is store)
+    assert(pickle.loads(pickle.dumps(store)) == store)
+    with pytest.raises(TypeError):
+        store["name"] = "other"
+    with pytest.raises(TypeError):
+        store["plugins"].append({"name": "c"})
+
+
+def test_copy_on_write():
+    pool = InternPool()
+    config1 = Config(get_store(1))
+    config2 = Config(get_store(2))
+    config1.intern(pool)
+    config2.intern(pool)
+    fingerprint = config1.fingerprint()
+
+    config1.set_value_at_path("c", "name", ["application", "plugins", 1])
+    assert(config1.get("application/plugins/1/name") == "c")
+    assert(config2.get("application/plugins/1/name") == "b")
+    assert(config1.store["application"]["plugins"][0] is config2.store["application"]["plugins"][0])
+
+    config1.update({"user": {"name": "other"}}, validate=False)
+    assert(config2.get("user/name") == "user")
+    assert(config1.store["user"]["emails"] is config2.store["user"]["emails"])
+
+    # Reads do not copy the shared nodes, which cannot be modified in place.
+    assert(config1["user"]["emails"] is config2["user"]["emails"])
+    with pytest.raises(TypeError):
+        config2["user"]["emails"].append("other@example.com")
+    assert(config1.fingerprint() != fingerprint)
+    assert(config1.fingerprint() == content_hash(config1.store))
+
+
+def test_config_mng():
+    mngs = [ConfigMng(instance_configs={"job": no}, application_configs=get_store(0)["application"],
+                      intern_subtrees=True) for no in range(5)]
+    assert(mngs[0].config["plugins"] is mngs[4].config["plugins"])
+    assert(mngs[4].config["job"] == 4)
+    report = memory_report([mng.config for mng in mngs])
+    assert(report["unique_bytes"] < report["bytes"])
+
+
+def test_frozen_hash_consistent_with_eq():
+    # Values that compare equal hash equally, although their content hashes differ.
+    nodes = [FrozenDict({"a": 1, "b": FrozenList([1, 2])}),
+             FrozenDict({"a": 1.0, "b": FrozenList([1.0, 2])}),
+             FrozenDict({"a": True, "b": FrozenList([True, 2])})]
+    assert(nodes[0] == nodes[1] == nodes[2])
+    assert(len({hash(node) for node in nodes}) == 1 and len(set(nodes)) == 1)
+    assert(content_hash(nodes[0]) != content_hash(nodes[1]))
+    assert(hash(Config({"a": 1}, frozen=True)) == hash(Config({"a": 1.0}, frozen=True)))
@@ -0,0 +1,56 @@
+import gc
+import weakref
+
+from configmng import Config
+from configmng.journal import ChangeJournal, MISSING
+
+
+def test_journal():
+    config = Config({"paths": {"root": "/root"}, "size": 1})
+    journal = config.journal
+    config["size"] = 2
+    config.update({"paths": {"log_dir": "/logs"}})
+    config.set_value_at_path("/other", "root", ["paths"])
+    del config["size"]
+    assert([(record.path, record.old, record.new) for record in journal.history()] ==
+           [(("size",), 1, 2), (("paths", "log_dir"), MISSING, "/logs"),
+            (("paths", "root"), "/root", "/other"), (("size",), 2, MISSING)])
+    assert(len(journal.history(["paths"])) == 2)
+    assert(journal.history(since=journal.history()[-1].timestamp + 1) == [])
+
+    undone = config.undo(3)
+    assert(len(undone) == 3)
+    assert(config.store == {"paths": {"root": "/root"}, "size": 2})
+
+
+def test_compaction(tmp_path):
+    journal = ChangeJournal(max_records=4, spill_path=tmp_path / "journal.pkl")
+    for value in range(10):
+        journal.record(("key",), value, value + 1)
+    assert(journal.compactions > 0 and journal.stats["records"] <= 4)
+    assert([record.new for record in journal.history()] == list(range(1, 11)))
+
+    journal = ChangeJournal(max_records=4)
+    config = Config({"key": 0})
+    config.provenance.journal = journal
+    for value in range(1, 11):
+        config["key"] = value
+    journal.compact()
+    assert(len(journal) == 1)
+    config.undo()
+    assert(config["key"] == 0)
+
+
+def test_sources_not_kept_alive():
+    source = Config({"key": 1})
+    merged = Config({"other": 2}) + source
+    assert(len(merged.provenance.sources) == 2)
+    merged.set_value_at_path(3, "key", [])
+    assert(source["key"] == 3)
+
+    reference = weakref.ref(source)
+    del source
+    gc.collect()
+    assert(reference() is None)
+    merged.set_value_at_path(4, "key", [])
+    assert(merged["key"] == 4)
@@ -0,0 +1,63 @@
+from copy import deepcopy
+
+import numpy as np
+import pytest
+import yaml
+
+from configmng import Config, NumericSequence, Schema
+from configmng.numeric import compact_sequences, expand_sequences
+
+
+numeric_schema = {"type": "map",
+                  "mapping": {"weights": {"type": "seq", "sequence": [{"type": "float"}]},
+                              "channels": {"type": "seq", "sequence": [{"type": "int"}]}}}
+
+
+def test_numeric_sequence():
+    seq = NumericSequence([1, 2, 3])
+    assert(seq.dtype == np.int64)
+    assert(seq == [1, 2, 3])
+    assert(seq[1] == 2 and isinstance(seq[1], int))
+    assert(seq[1:] == [2, 3])
+    assert(2 in seq)
+    assert(deepcopy(seq) is seq)
+    with pytest.raises(ValueError):
+        seq.array[0] = 10
+    with pytest.raises(TypeError):
+        NumericSequence(["a", "b"])
+
+
+def test_compact_sequences():
+    data = {"a": list(range(20)), "b": {"c": [0.5] * 20, "d": [1, "x"] * 10}, "e": [1, 2]}
+    compacted = compact_sequences(data)
+    assert(isinstance(compacted["a"], NumericSequence))
+    assert(compacted["b"]["c"].dtype == np.float64)
+    assert(isinstance(compacted["b"]["d"], list))
+    assert(isinstance(compacted["e"], list))
+    assert(expand_sequences(compacted) == data)
+
+
+def test_config_compact_numeric(tmp_path):
+    data = {"weights": [0.5] * 32, "channels": list(range(32))}
+    config = Config(data, schemas=Schema(numeric_schema), compact_numeric=True)
+    assert(isinstance(config["channels"], NumericSequence))
+    assert(config == Config(data))
+
+    merged = config + Config({"other": 1})
+    assert(merged["channels"] is config["channels"])
+
+    path = tmp_path / "config.yaml"
+    path.touch()
+    config.save(path)
+    with path.open() as stream:
+        assert(yaml.safe_load(stream) == data)
+
+
+def test_npy_sidecar(tmp_path):
+    np.save(str(tmp_path / "channels.npy"), np.arange(100))
+    path = tmp_path / "config.yaml"
+    path.write_text("channels: !npy channels.npy\n")
+
+    config = Config(path, schemas=Schema(numeric_schema))
+    assert(isinstance(config["channels"].array, np.memmap))
+    assert(config["channels"] == list(range(100)))
@@ -0,0 +1,38 @@
+from configmng import Config, ConfigMng
+from configmng.query import compile_query
+
+
+def test_path_pattern():
+    assert(compile_query("*/log_dir").match(("paths", "log_dir")))
+    assert(not compile_query("*/log_dir").match(("a", "paths", "log_dir")))
+    assert(compile_query("**/log_dir").match(("a", "paths", "log_dir")))
+    assert(compile_query("regex;subject_.*").match(("subject_01",)))
+    assert(not compile_query("regex;subject_.*").match(("other",)))
+
+
+def test_config_query():
+    config = Config({"paths": {"log_dir": "/logs", "root": "/root"},
+                     "subject_01": {"log_dir": "/logs/01"}, "subject_02": {}})
+    assert([(result.path, result.value) for result in config.query("*/log_dir")] ==
+           [(("paths", "log_dir"), "/logs"), (("subject_01", "log_dir"), "/logs/01")])
+    assert([result.path for result in config.query("regex;subject_.*")] ==
+           [("subject_01",), ("subject_02",)])
+
+    # The index is maintained incrementally and query results are cached.
+    config.query("*/log_dir")
+    assert(config._query_index.stats["builds"] == 1)
+    config["subject_02"] = {"log_dir": "/logs/02"}
+    del config["subject_01"]
+    config.update({"paths": {"log_dir": "/other_logs"}}, validate=False)
+    assert([(result.path, result.value) for result in config.query("*/log_dir")] ==
+           [(("paths", "log_dir"), "/other_logs"), (("subject_02", "log_dir"), "/logs/02")])
+    assert(config._query_index.stats["builds"] == 1)
+
+
+def test_configmng_query():
+    mng = ConfigMng(application_configs={"paths": {"log_dir": "/logs"}},
+                    user_configs=Config({"log_dir": "/user_logs"}, insertion_node=["paths"]))
+    results = mng.query("paths/log_dir")
+    assert([(result.level, result.config_name, result.value) for result in results] ==
+           [("application", "conf_0", "/logs"), ("user", "conf_0", "/user_logs")])
+    assert(results[1].path == ("paths", "log_dir"))
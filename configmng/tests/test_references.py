@@ -0,0 +1,62 @@
+import pytest
+
+from configmng import Config, ConfigMng
+from configmng.exceptions import ReferenceCycle, UnresolvedReference
+
+
+def test_resolve():
+    config = Config({"paths": {"root": "/data", "logs": "${paths.root}/logs",
+                               "debug": "${paths.logs}/debug"},
+                     "sizes": [1, 2, 3],
+                     "first_size": "${sizes.0}",
+                     "all_paths": "${paths}",
+                     "literal": "$${paths.root}"})
+    assert(config.resolve(["paths", "debug"]) == "/data/logs/debug")
+    assert(config.resolve(["first_size"]) == 1)
+    assert(config.resolve(["all_paths"]) == {"root": "/data", "logs": "/data/logs",
+                                             "debug": "/data/logs/debug"})
+    assert(config.resolve(["literal"]) == "${paths.root}")
+    assert(config.resolve()["paths"]["logs"] == "/data/logs")
+    # The store keeps the unresolved values.
+    assert(config["paths"]["logs"] == "${paths.root}/logs")
+
+
+def test_invalidation():
+    config = Config({"paths": {"root": "/data", "logs": "${paths.root}/logs"},
+                     "other": {"value": "${name}", "name": "${other.value}"},
+                     "name": "a"})
+    assert(config.resolve(["paths", "logs"]) == "/data/logs")
+    assert(config.resolve(["other", "name"]) == "a")
+
+    config.set_value_at_path("/scratch", "root", ["paths"])
+    cache = config._resolver._cache
+    assert(("paths", "logs") not in cache)
+    assert(("other", "name") in cache)
+    assert(config.resolve(["paths", "logs"]) == "/scratch/logs")
+
+    config["name"] = "b"
+    assert(("other", "value") not in cache and ("other", "name") not in cache)
+    assert(config.resolve(["other", "name"]) == "b")
+
+    config.update({"paths": {"logs": "${name}/logs"}}, validate=False)
+    assert(config.resolve(["paths", "logs"]) == "b/logs")
+    config["paths"] = {"root": "/", "logs": "${paths.root}"}
+    assert(config.resolve(["paths", "logs"]) == "/")
+
+
+def test_errors():
+    config = Config({"a": "${b}", "b": "${c.d}", "c": {"d": "${a}"}, "e": "${missing.key}"})
+    with pytest.raises(ReferenceCycle):
+        config.resolve(["a"])
+    with pytest.raises(UnresolvedReference):
+        config.resolve(["e"])
+
+    config.set_value_at_path("value", "d", ["c"])
+    assert(config.resolve(["a"]) == "value")
+
+
+def test_config_mng():
+    config_mng = ConfigMng(application_configs={"paths": {"root": "/data",
+                                                          "logs": "${paths.root}/logs"}},
+                           user_configs={"paths": {"root": "/home"}})
+    assert(config_mng.resolve(["paths", "logs"]) == "/home/logs")
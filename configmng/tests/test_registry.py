@@ -0,0 +1,71 @@
+import gc
+import os
+
+import pytest
+from pykwalify.errors import SchemaError
+
+from configmng import ConfigMng, Schema
+from configmng.registry import ConfigRegistry
+
+
+def test_registry(tmp_path):
+    registry = ConfigRegistry(max_size=2)
+    paths = []
+    for no in range(3):
+        paths.append(tmp_path / "config_{}.yaml".format(no))
+        paths[-1].write_text("paths:\n  root: /root_{}\n".format(no))
+
+    config = registry.get(paths[0])
+    assert(config.frozen and config["paths"]["root"] == "/root_0")
+    assert(registry.get(str(paths[0])) is config)
+    assert(registry.get(paths[0], insertion_node=["a"]) is not config)
+    schema = Schema({"type": "map", "mapping": {"paths": {"type": "map", "mapping": {
+        "root": {"type": "str"}}}}})
+    assert(registry.get(paths[0], schemas=schema).schemas == [schema])
+    assert(registry.stats["hits"] == 1 and registry.stats["misses"] == 3)
+    assert(registry.stats["evictions"] == 1)
+
+    # Stale entries are detected by stat.
+    paths[0].write_text("paths:\n  root: /other_root\n")
+    os.utime(str(paths[0]), ns=(0, 0))
+    reloaded = registry.get(paths[0])
+    assert(reloaded is not config and reloaded["paths"]["root"] == "/other_root")
+    assert(registry.stats["reloads"] == 1)
+
+    # Evicted configurations are freed once unused.
+    del config, reloaded
+    registry.get(paths[1])
+    registry.get(paths[2])
+    gc.collect()
+    assert(paths[0] not in registry)
+    assert(registry.stats["recent"] == 2)
+
+
+def test_config_mng(tmp_path):
+    path = tmp_path / "user.yaml"
+    path.write_text("paths:\n  root: /root\n")
+    registry = ConfigRegistry()
+    mng1 = ConfigMng(user_configs=str(path), registry=registry)
+    mng2 = ConfigMng(user_configs=str(path), registry=registry)
+    assert(mng1.config.store["paths"] is mng2.config.store["paths"])
+    assert(registry.stats["hits"] == 1)
+
+
+def test_validation_policy(tmp_path):
+    path = tmp_path / "user.yaml"
+    path.write_text("paths:\n  root: 1\n")
+    schema = Schema({"type": "map", "mapping": {"paths": {"type": "map", "mapping": {
+        "root": {"type": "str"}}}}})
+    registry = ConfigRegistry()
+    assert(registry.get(path, schemas=schema, validate=False)["paths"]["root"] == 1)
+    # Validated the first time it is requested with validate=True.
+    with pytest.raises(SchemaError):
+        registry.get(path, schemas=schema)
+
+    path.write_text("paths:\n  root: /root\n")
+    mng = ConfigMng(user_configs=str(path), registry=registry, validation_policy="explicit")
+    assert(mng._levels["user"].validation_count == 0)
+    # The merged configuration stays mutable although the registered one is frozen.
+    mng.config["paths"]["root"] = "/other_root"
+    assert(mng.config["paths"]["root"] == "/other_root")
+    assert(registry.get(path)["paths"]["root"] == "/root")
@@ -1,6 +1,8 @@
 from configmng import Schema
+from configmng.schema import ShadowBehavior
 from pathlib import Path
 import pytest
+import re
 from io import StringIO
 from copy import deepcopy
 
@@ -77,3 +79,98 @@ def test_merging():
     assert("level2a" in merged_schema_data["mapping"]["level1"]["mapping"])
     assert("level2b" in merged_schema_data["mapping"]["level1"]["mapping"])
     assert("level2c" in merged_schema_data["mapping"]["level1"]["mapping"])
+
+
+def test_merge_sequences():
+    shadow_behavior = ShadowBehavior()
+    left = [1, {"a": [1, 2]}, [3]]
+    right = [{"a": [1, 2]}, 2, [3], [4], 2]
+    assert(shadow_behavior.merge_sequences(left, right, "enum") == [1, {"a": [1, 2]}, [3], 2, [4], 2])
+
+    expected = {"unique_right_extend_left": [1, 2, 3, 4],
+                "unique_left_extend_right": [2, 3, 4, 1],
+                "right_extend_left": [1, 2, 3, 2, 3, 4],
+                "left_extend_right": [2, 3, 4, 1, 2, 3],
+                "last_dominate": [2, 3, 4],
+                "first_dominate": [1, 2, 3]}
+    for strategy, merged in expected.items():
+        shadow_behavior.sequence_shadow_dominance = strategy
+        assert(shadow_behavior.merge_sequences([1, 2, 3], [2, 3, 4], "enum") == merged)
+
+    with pytest.raises(ValueError):
+        shadow_behavior.sequence_shadow_dominance = "unknown"
+
+
+def test_merge_scalars():
+    shadow_behavior = ShadowBehavior()
+    assert(shadow_behavior.merge_scalars(True, False, "required") is False)
+    assert(shadow_behavior.merge_scalars(True, False, "req") is False)
+    assert(shadow_behavior.merge_scalars("a", "b", "desc") == "b")
+
+    shadow_behavior.rules["required"] = "permissive"
+    assert(shadow_behavior.merge_scalars(True, False, "req") is True)
+
+    shadow_behavior.register_rule("desc", "join", lambda value1, value2, key: value1 + " " + value2)
+    assert(shadow_behavior.merge_scalars("a", "b", "desc") == "a b")
+    shadow_behavior.set_rule("unique", lambda value1, value2, key: value1 or value2)
+    assert(shadow_behavior.merge_scalars(True, False, "unique") is True)
+
+    with pytest.raises(ValueError):
+        shadow_behavior.rules["type"] = "permissive"
+    with pytest.raises(ValueError):
+        shadow_behavior.default_shadow_dominance = "unknown"
+
+
+def test_merge_patterns():
+    schemas = [Schema({"type": "map", "mapping": {"key": {"type": "str", "pattern": pattern}}})
+               for pattern in ["a.*", ".*b", ".*c.*", "a.*"]]
+    merged_schema = Schema.merge_schemas(schemas)
+    pattern = merged_schema.load()["mapping"]["key"]["pattern"]
+    assert(pattern == "^(?=a.*$)(?=.*b$)(?=.*c.*$)")
+    assert(re.match(pattern, "axcb"))
+    assert(not re.match(pattern, "axb"))
+
+    shadow_behavior = ShadowBehavior()
+    shadow_behavior.rules["pattern"] = "conservative"
+    merged_schema = Schema.merge_schemas(schemas, shadow_behavior=shadow_behavior)
+    assert(merged_schema.load()["mapping"]["key"]["pattern"] == "(a.*)|(.*b)|(.*c.*)")
+
+
+def test_pattern_merge_deterministic():
+    from configmng.patterns import pattern_union, pattern_intersection
+    # Merged patterns are flattened from their text alone, e.g., when they were
+    # built in another process and read back from a bundle or a cache.
+    assert(pattern_union.__wrapped__("(a)|(b)", "c") == "(a)|(b)|(c)")
+    assert(pattern_union.__wrapped__("(a|b)|([)])", "a|b") == "(a|b)|([)])")
+    assert(pattern_intersection.__wrapped__("^(?=a.*$)(?=.*b$)", ".*b") == "^(?=a.*$)(?=.*b$)")
+    assert(pattern_union.__wrapped__("(a)b", "c") == "((a)b)|(c)")
+    assert(pattern_union.__wrapped__("(?:a)|(b)", "c") == "((?:a)|(b))|(c)")
+
+
+def test_in_memory_data():
+    schema_path = Path(__file__).parent / "test_artifacts" / "test_config_schema.yaml"
+    schema = Schema(schema_path)
+    assert(schema.path == schema_path)
+
+    data = schema.load()
+    data["mapping"]["level1"]["required"] = False
+    assert(schema.load()["mapping"]["level1"]["required"] is True)
+
+    schema.set(["mapping", "level1", "required"], False)
+    assert(schema.load(copy=False)["mapping"]["level1"]["required"] is False)
+    assert(schema.path != schema_path)
+    assert(yaml.load(schema.schema_io.read(), Loader=Loader) == schema.load())
+
+
+def test_fingerprint():
+    schema_path = Path(__file__).parent / "test_artifacts" / "test_config_schema.yaml"
+    data = Schema(schema_path).load()
+    schema1 = Schema(data)
+    schema2 = Schema(deepcopy(data))
+    assert(schema1 == schema2)
+    assert(len({schema1, schema2, Schema(schema_path), Schema(str(schema_path))}) == 2)
+
+    fingerprint = schema1.fingerprint
+    schema1.set(["mapping", "level1", "required"], False)
+    assert(schema1.fingerprint != fingerprint)
+    assert(schema1 != schema2)
@@ -0,0 +1,39 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from configmng import Config, Schema
+from configmng.typed import TypedView
+
+
+def test_typed_view():
+    schema = Schema({"type": "map", "mapping": {
+        "paths": {"type": "map", "mapping": {"regex;(.+)": {"type": "str"}}},
+        "workers": {"type": "int"},
+        "ratio": {"type": "float"},
+        "debug": {"type": "bool"},
+        "start": {"type": "timestamp"},
+        "name": {"type": "str"}}})
+    config = Config({"paths": {"log_dir": "/logs"}, "workers": 4, "ratio": 1,
+                     "debug": True, "start": "2024-01-02T03:04:05", "name": "job"}, schemas=schema)
+    view = TypedView(config)
+    assert(view["paths/log_dir"] == Path("/logs"))
+    assert(isinstance(view.get("ratio"), float))
+    assert(view.get("start") == datetime(2024, 1, 2, 3, 4, 5))
+    assert(view.get_many(["workers", "debug", "name", "missing"], 0) == [4, True, "job", 0])
+    with pytest.raises(KeyError):
+        view["missing"]
+
+    # Converted values are memoized until the configuration is modified.
+    assert(view.get("paths/log_dir") is view.get("paths/log_dir"))
+    config["paths"] = {"log_dir": "/other_logs"}
+    assert(view.get("paths/log_dir") == Path("/other_logs"))
+    config.set("ratio", 2)
+    assert(view.get("ratio") == 2.0 and isinstance(view.get("ratio"), float))
+    assert(view.stats["values"] == 6)
+    config.update({"workers": 8, "ratio": 3}, validate=False)
+    assert(view.get_many(["workers", "ratio"]) == [8, 3.0])
+
+    del view
+    assert(len(config._subscriptions) == 0)
@@ -0,0 +1,106 @@
+import pytest
+from pykwalify.core import Core
+from pykwalify.errors import SchemaError
+
+from configmng import Config, NumericSequence, Schema
+from configmng.validation import ConfigCore, prepare_source_data, validate_paths
+
+
+schema_data = {"type": "map",
+               "mapping": {"weights": {"type": "seq",
+                                       "sequence": [{"type": "float", "range": {"min": 0, "max-ex": 1}}]},
+                           "channels": {"type": "seq",
+                                        "sequence": [{"type": "int", "enum": [1, 2, 3]}]},
+                           "names": {"type": "seq", "sequence": [{"type": "str"}]}}}
+
+
+def get_data():
+    weights = [0.5] * 50
+    weights[3] = 1.0
+    weights[10] = -0.1
+    channels = [1, 2, 3] * 20
+    channels[7] = 9
+    return {"weights": weights, "channels": channels, "names": ["a", "b"]}
+
+
+def test_array_errors_match_pykwalify():
+    data = get_data()
+    core = Core(source_data=data, schema_data=schema_data)
+    core.validate(raise_exception=False)
+    config_core = ConfigCore(source_data=data, schema_data=schema_data)
+    config_core.validate(raise_exception=False)
+    assert(sorted(map(str, core.errors)) == sorted(map(str, config_core.errors)))
+    assert(sorted(error.path for error in config_core.errors) == ["/channels/7", "/weights/10", "/weights/3"])
+
+    prepared_data, _ = prepare_source_data(data, schema_data)
+    assert(prepared_data == {"weights": [], "channels": [], "names": ["a", "b"]})
+
+
+def test_numeric_sequence_type():
+    data = {"channels": NumericSequence([1.0] * 20)}
+    core = ConfigCore(source_data=data, schema_data=schema_data)
+    with pytest.raises(SchemaError):
+        core.validate()
+    assert(len(core.errors) == 20)
+    assert("is not of type 'int'" in str(core.errors[0]))
+
+
+def test_validate():
+    config = Config(get_data(), compact_numeric=True)
+    config.add_schemas(Schema(schema_data))
+    with pytest.raises(SchemaError):
+        config.validate(interactive=False)
+
+    key, path = config._split_error_path("/weights/3")
+    assert((key, path) == (3, ["weights"]))
+    assert(isinstance(config["weights"], list))
+
+
+def test_validate_paths():
+    paths_schema = {"type": "map",
+                    "mapping": {"paths": {"type": "map", "required": True,
+                                          "mapping": {"root": {"type": "str", "required": True},
+                                                      "regex;(.+_dir)": {"type": "str"}}},
+                                "jobs": {"type": "seq",
+                                         "sequence": [{"type": "map",
+                                                       "mapping": {"cpus": {"type": "int"}}}]}}}
+
+    def errors(data, paths):
+        errors = validate_paths(data, paths_schema, paths)
+        core = Core(source_data=data, schema_data=paths_schema)
+        core.validate(raise_exception=False)
+        assert(sorted(map(str, errors)) == sorted(map(str, core.errors)))
+        return errors
+
+    data = {"paths": {"root": "/root", "log_dir": "/logs"}, "jobs": [{"cpus": 1}, {"cpus": 2}]}
+    assert(errors(data, [("paths", "log_dir"), ("jobs", 1, "cpus")]) == [])
+
+    data["jobs"][1]["cpus"] = "two"
+    assert(len(errors(data, [("jobs", 1, "cpus")])) == 1)
+    data["jobs"][1]["cpus"] = 2
+
+    del data["paths"]["root"]
+    assert(len(errors(data, [("paths", "root")])) == 1)
+    data["paths"]["root"] = "/root"
+
+    data["paths"]["other"] = 1
+    assert(len(errors(data, [("paths", "other")])) == 1)
+    del data["paths"]["other"]
+
+    data["paths"] = "/root"
+    assert(len(errors(data, [("paths",)])) == 1)
+
+    assert(validate_paths(data, {"schema;partial": {"type": "str"}, "type": "any"}, [()]) is None)
+
+    # The subtrees that are not modified are neither copied nor visited.
+    class Untouched(dict):
+        def items(self):
+            raise AssertionError("Unmodified subtrees should not be visited.")
+        __iter__ = values = items
+
+    data = {"paths": {"root": "/root"}, "jobs": [{"cpus": 1}, Untouched(cpus=2)],
+            "other": Untouched(key=1)}
+    schema = dict(paths_schema, mapping=dict(paths_schema["mapping"], other={"type": "any"}))
+    assert(validate_paths(data, schema, [("paths", "root"), ("jobs", 0, "cpus")]) == [])
+    data["paths"]["root"] = None
+    assert(len(validate_paths(data, schema, [("paths", "log_dir")])) == 1)
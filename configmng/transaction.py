@@ -0,0 +1,84 @@
+from collections.abc import Mapping
+from copy import deepcopy
+import typing
+
+from .frozen import thaw_child
+from .journal import MISSING
+
+
+class Transaction:
+    """
+     State of a transaction opened with Config.transaction or
+     ConfigMng.transaction. For configurations, the previous value of every node
+     modified during the transaction is recorded the first time it is modified,
+     so that the store can be rolled back.
+    """
+
+    def __init__(self):
+        self.undo: typing.List[typing.Tuple[tuple, typing.Any]] = []
+        self._recorded: typing.Set[tuple] = set()
+        self.save_pending = False
+        self.update_pending = False
+        self.validate_pending = False
+
+    @property
+    def touched(self) -> bool:
+        return len(self.undo) > 0 or self.update_pending
+
+    def record(self, store: Mapping, path: typing.Sequence):
+        """
+         Record the value at path before it gets modified, unless the value
+         of path or of one of its ancestors has already been recorded.
+        """
+        path = tuple(path)
+        parent = store
+        try:
+            for key in path[:-1]:
+                parent = parent[key]
+        except (KeyError, IndexError, TypeError):
+            return
+        self._record_child(parent, path[-1], path)
+
+    def record_update(self, store: Mapping, update_mapping: Mapping, path: tuple = ()):
+        """
+         Record the nodes that utils.update(store, update_mapping) is going to
+         modify, i.e., the first node along each updated path that is either
+         missing or not a mapping.
+        """
+        for key, value in update_mapping.items():
+            child_path = path + (key,)
+            if key in store and isinstance(store[key], Mapping) and isinstance(value, Mapping):
+                self.record_update(store[key], value, child_path)
+            else:
+                self._record_child(store, key, child_path)
+
+    def _record_child(self, parent, key, path: tuple):
+        if any(path[:no] in self._recorded for no in range(len(path) + 1)):
+            return
+        try:
+            previous = deepcopy(parent[key])
+        except (KeyError, IndexError, TypeError):
+            previous = MISSING
+        self._recorded.add(path)
+        self.undo.append((path, previous))
+
+    def rollback(self, store: Mapping) -> typing.List[tuple]:
+        """
+         Restore the recorded values in store and return the restored paths.
+        """
+        restored = []
+        for path, previous in reversed(self.undo):
+            node = store
+            try:
+                for key in path[:-1]:
+                    node = thaw_child(node, key)
+            except (KeyError, IndexError, TypeError):
+                continue
+            if previous is MISSING:
+                node.pop(path[-1], None)
+            else:
+                node[path[-1]] = previous
+            restored.append(path)
+        self.undo = []
+        self._recorded = set()
+        return restored
@@ -0,0 +1,189 @@
+from collections.abc import Mapping
+from datetime import date, datetime
+from pathlib import Path
+import weakref
+import typing
+
+from .config import Config, get_schema_node
+from .numeric import NumericSequence
+from .references import PathIndex
+from .subscriptions import ANY_PATH
+from .utils import as_keys, get_path
+
+_missing = object()
+
+# Nodes whose string values are converted to Path objects by default.
+DEFAULT_PATH_NODES = (("paths",),)
+
+
+def to_bool(value) -> bool:
+    if isinstance(value, str):
+        if value.strip().lower() in ("true", "yes", "y", "on", "1"):
+            return True
+        if value.strip().lower() in ("false", "no", "n", "off", "0", ""):
+            return False
+        raise ValueError("Cannot convert {!r} to a boolean.".format(value))
+    return bool(value)
+
+
+def to_number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return float(value)
+
+
+def to_date(value) -> date:
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def to_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    return datetime.fromisoformat(str(value))
+
+
+# Converters of the pykwalify scalar types. Other types (e.g., map, seq, any)
+# are returned unchanged.
+CONVERTERS = {"int": int,
+              "float": float,
+              "number": to_number,
+              "bool": to_bool,
+              "str": str,
+              "text": str,
+              "date": to_date,
+              "timestamp": to_datetime}
+
+
+class TypedView:
+    """
+     Read-only view of a configuration returning its values converted to the
+     types of the schemas of the configuration (e.g., int, float, bool, date,
+     datetime), and string values under path_nodes to Path objects.
+
+     The converter of each path is compiled once from the merged schema and the
+     converted values are memoized until the configuration is modified (through
+     __setitem__, update, set_value_at_path, merges, etc.; see Config.subscribe)
+     or its schemas change.
+    """
+
+    __slots__ = ("_config", "path_nodes", "_schema", "_schema_keys", "_converters",
+                 "_values", "_index", "_subscription", "__weakref__")
+
+    def __init__(self, config: Config, path_nodes: typing.Iterable = DEFAULT_PATH_NODES):
+        """
+        :param path_nodes: Paths (strings or sequences of keys) of the nodes whose
+                           string values are returned as Path objects.
+        """
+        self._config = config
+        self.path_nodes = [as_keys(path) for path in path_nodes]
+        self._schema = None
+        self._schema_keys = None
+        self._converters: typing.Dict[tuple, typing.Callable] = {}
+        self._values: typing.Dict[tuple, typing.Any] = {}
+        self._index = PathIndex()
+
+        # The subscription does not keep the view alive.
+        reference = weakref.ref(self)
+
+        def invalidate(config, paths):
+            view = reference()
+            if view is not None:
+                for path in paths:
+                    view.invalidate(path)
+
+        self._subscription = config.subscribe(ANY_PATH, invalidate, all_paths=True)
+
+    def __del__(self):
+        self._subscription.cancel()
+
+    @property
+    def config(self) -> Config:
+        return self._config
+
+    def invalidate(self, path: typing.Sequence = ()):
+        """
+         Forget the converted values at, under and above path.
+        """
+        path = tuple(path)
+        for no in range(len(path) + 1):
+            if path[:no] in self._values:
+                del self._values[path[:no]]
+                self._index.remove(path[:no])
+        for cached_path in list(self._index.under(path)):
+            del self._values[cached_path]
+            self._index.remove(cached_path)
+
+    def _check_schemas(self):
+        if self._schema_keys != self._config._schemas.keys():
+            self._schema_keys = set(self._config._schemas)
+            self._schema = self._config.merged_schema().load(copy=False) if self._schema_keys else {}
+            self._converters = {}
+            self._values = {}
+            self._index = PathIndex()
+
+    def converter(self, keys: tuple) -> typing.Optional[typing.Callable]:
+        """
+         Return the converter of the values at keys, or None if they are returned
+         unchanged.
+        """
+        try:
+            return self._converters[keys]
+        except KeyError:
+            pass
+
+        converter = None
+        if keys:
+            try:
+                schema_type = get_schema_node(self._schema, keys[:-1], keys[-1]).get("type", "str")
+            except (NotImplementedError, TypeError, KeyError, AttributeError):
+                schema_type = None
+            converter = CONVERTERS.get(schema_type)
+            if converter is str or schema_type is None:
+                if any(keys[:len(node)] == node for node in self.path_nodes) and len(keys) > 1:
+                    converter = Path
+        self._converters[keys] = converter
+        return converter
+
+    def get(self, path, default=None):
+        """
+         Return the converted value at path (see Config.get), or default if it is missing.
+        """
+        keys = as_keys(path)
+        self._check_schemas()
+        try:
+            return self._values[keys]
+        except KeyError:
+            pass
+
+        value = get_path(self._config.store, keys, _missing)
+        if value is _missing:
+            return default
+        # Only scalars are converted, and only strings to paths.
+        converter = self.converter(keys)
+        if converter is not None and not isinstance(value, (Mapping, list, NumericSequence)) \
+                and (converter is not Path or isinstance(value, str)):
+            value = converter(value)
+        self._values[keys] = value
+        self._index.add(keys)
+        return value
+
+    def get_many(self, paths: typing.Iterable, default=None) -> list:
+        return [self.get(path, default) for path in paths]
+
+    def __getitem__(self, path):
+        value = self.get(path, _missing)
+        if value is _missing:
+            raise KeyError(path)
+        return value
+
+    def __contains__(self, path):
+        return self.get(path, _missing) is not _missing
+
+    @property
+    def stats(self) -> dict:
+        return {"converters": len(self._converters),
+                "values": len(self._values)}
@@ -1,5 +1,10 @@
 from collections.abc import Mapping
 from copy import deepcopy
+from functools import lru_cache
+from pathlib import Path
+import hashlib
+
+import numpy as np
 
 import yaml
 try:
@@ -7,6 +12,10 @@ try:
 except ImportError:
     from yaml import Loader, Dumper
 
+from .numeric import NumericSequence, _numeric_dtype
+from .patterns import compile_pattern
+from .frozen import FrozenDict, FrozenList, thaw
+
 
 def yn_choice(message, default='y'):
     choices = 'Y[yes]/n[no)/a[abort]' if default.lower() in ('y', 'yes') else 'y[yes]/N[no)/a[abort]'
@@ -17,6 +26,19 @@ def yn_choice(message, default='y'):
     return choice.strip().lower() in values
 
 
+def check_regex_key(map, key):
+    if key in map:
+        return map[key]
+
+    for map_key in map:
+        if "regex" in map_key:
+            regex = map_key.split(";")[1]
+            if compile_pattern(regex).match(key):
+                return map[map_key]
+
+    raise TypeError
+
+
 def get_node(dict_obj, path):
     obj_to_return = dict_obj
     for level in path:
@@ -24,8 +46,49 @@ def get_node(dict_obj, path):
     return obj_to_return
 
 
+@lru_cache(maxsize=4096)
+def parse_path(path: str) -> tuple:
+    """
+     Split a key path such as "paths/log_dir" into its keys. Parsed paths are cached.
+    """
+    return tuple(key for key in path.split("/") if key != "")
+
+
+def as_keys(path) -> tuple:
+    """
+     Keys of path, given as a "/"-separated string, a sequence of keys, or a single
+     non-string key.
+    """
+    if isinstance(path, str):
+        return parse_path(path)
+    if isinstance(path, tuple):
+        return path
+    if isinstance(path, list):
+        return tuple(path)
+    return (path,)
+
+
+def get_path(node, keys: tuple, default=None):
+    """
+     Return the value at keys under node, or default if it is missing. String keys
+     made of digits (e.g., from "jobs/0/name") index sequences.
+    """
+    for key in keys:
+        try:
+            node = node[key]
+        except (KeyError, IndexError, TypeError):
+            if isinstance(node, Mapping) or not isinstance(key, str) or not key.isdigit():
+                return default
+            try:
+                node = node[int(key)]
+            except (KeyError, IndexError, TypeError):
+                return default
+    return node
+
+
 # Recursive updates. Default dictionary update is not recursive, which
-# cause dict within dict to be simply overwritten rather than merged
+# cause dict within dict to be simply overwritten rather than merged.
+# Frozen (shared) nodes of d are copied before being updated.
 def update(d, u):
     for k, v in u.items():
         if k not in d:
@@ -41,12 +104,24 @@ def update(d, u):
             if not isinstance(dv, Mapping) and not hasattr(dv, "keys"):
                 d[k] = v
             elif isinstance(v, Mapping) or hasattr(v, "keys"):
-                d[k] = update(dv, deepcopy(v))
+                d[k] = update(thaw(dv), deepcopy(v))
             else:
                 d[k] = v
     return d
 
 
+def leaf_paths(mapping, path=()):
+    """
+     Yield the paths (as tuples) of the non-mapping values and of the empty
+     mappings of nested mappings.
+    """
+    for key, value in mapping.items():
+        if isinstance(value, Mapping) and len(value):
+            yield from leaf_paths(value, path + (key,))
+        else:
+            yield path + (key,)
+
+
 def eq_mappable(map1, map2):
     if isinstance(map1, Mapping) and isinstance(map2, Mapping):
         if len(map1) != len(map2):
@@ -63,17 +138,104 @@ def eq_mappable(map1, map2):
     return map1 == map2
 
 
+def hash_mapping(items) -> str:
+    """
+     Hash of a mapping given as (key, content hash of the value) pairs.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(b"map")
+    for key, value_hash in sorted((repr(key), value_hash) for key, value_hash in items):
+        hasher.update(key.encode())
+        hasher.update(b"\0")
+        hasher.update(value_hash.encode())
+    return hasher.hexdigest()
+
+
+def hash_sequence(value_hashes) -> str:
+    """
+     Hash of a (non-numeric) list given as the content hashes of its values.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(b"seq")
+    for value_hash in value_hashes:
+        hasher.update(value_hash.encode())
+    return hasher.hexdigest()
+
+
+def content_hash(data) -> str:
+    """
+     Stable hash of nested mappings, sequences and scalars, independent of the
+     order of mapping keys. Lists of numbers and NumericSequence objects holding
+     the same values with the same dtype have the same hash.
+    """
+    if isinstance(data, Mapping):
+        return hash_mapping((key, content_hash(value)) for key, value in data.items())
+
+    hasher = hashlib.blake2b(digest_size=16)
+    if isinstance(data, (list, NumericSequence)):
+        dtype = None if isinstance(data, NumericSequence) else _numeric_dtype(data)
+        if isinstance(data, NumericSequence) or (dtype is not None and len(data)):
+            try:
+                array = data.array if dtype is None else np.asarray(data, dtype=dtype)
+                hasher.update(b"array" + array.dtype.str.encode())
+                hasher.update(array.tobytes())
+                return hasher.hexdigest()
+            except OverflowError:
+                pass
+        return hash_sequence(content_hash(value) for value in data)
+    elif isinstance(data, tuple):
+        hasher.update(b"tuple")
+        for value in data:
+            hasher.update(content_hash(value).encode())
+    else:
+        hasher.update("{}:{!r}".format(type(data).__name__, data).encode())
+    return hasher.hexdigest()
+
+
 def join(loader, _, node):
     seq = loader.construct_sequence(node)
     return ''.join([str(i) for i in seq])
 
 
+def npy(loader, node):
+    path = Path(loader.construct_scalar(node))
+    base_dir = getattr(loader, "base_dir", None)
+    if base_dir is not None and not path.is_absolute():
+        path = base_dir / path
+    return NumericSequence.from_npy(path)
+
+
+def represent_numeric_sequence(dumper, data):
+    return dumper.represent_list(data.tolist())
+
+
 def pretty_print(data):
-    print(yaml.dump(data, default_flow_style=False, default_style=''))
+    print(yaml.dump(data, default_flow_style=False, default_style='', Dumper=ConfigMngDumper))
+
+
+def load_yaml(path):
+    # Same as yaml.load, but lets constructors (e.g., !npy) resolve paths
+    # relative to the directory of the YAML file.
+    path = Path(path)
+    with path.open('r') as stream:
+        loader = ConfigMngLoader(stream)
+        loader.base_dir = path.parent
+        try:
+            return loader.get_single_data()
+        finally:
+            loader.dispose()
 
 
 class ConfigMngLoader(Loader):
     pass
 
 
+class ConfigMngDumper(Dumper):
+    pass
+
+
 ConfigMngLoader.add_multi_constructor("!join", join)
+ConfigMngLoader.add_constructor("!npy", npy)
+ConfigMngDumper.add_representer(NumericSequence, represent_numeric_sequence)
+ConfigMngDumper.add_representer(FrozenDict, ConfigMngDumper.represent_dict)
+ConfigMngDumper.add_representer(FrozenList, ConfigMngDumper.represent_list)
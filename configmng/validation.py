@@ -0,0 +1,261 @@
+from collections.abc import Mapping
+from numbers import Real
+
+import numpy as np
+from pykwalify.core import Core
+from pykwalify.errors import SchemaError
+
+from .numeric import NumericSequence, MIN_COMPACT_LENGTH, _numeric_dtype
+from .utils import check_regex_key
+
+
+# Sequences can only be checked as whole arrays if their rules contain
+# nothing else than these keys. Other rules (e.g., pattern, unique, func)
+# are left to pykwalify.
+ARRAY_SEQUENCE_KEYS = {"type", "sequence", "seq", "required", "req", "desc", "name", "nullable"}
+ARRAY_ITEM_KEYS = {"type", "range", "enum", "required", "req", "desc", "name", "nullable"}
+ARRAY_ITEM_TYPES = {"int", "float", "number"}
+
+
+def _child_rule(rule, key):
+    if not isinstance(rule, Mapping):
+        return None
+    mapping = rule.get("mapping", rule.get("map"))
+    if not isinstance(mapping, Mapping):
+        return None
+    try:
+        return check_regex_key(mapping, key)
+    except TypeError:
+        return None
+
+
+def _item_rule(rule):
+    if not isinstance(rule, Mapping):
+        return None
+    sequence = rule.get("sequence", rule.get("seq"))
+    if not isinstance(sequence, list) or len(sequence) != 1:
+        return None
+    return sequence[0]
+
+
+def _array_item_rule(rule):
+    item_rule = _item_rule(rule)
+    if item_rule is None or not set(rule).issubset(ARRAY_SEQUENCE_KEYS):
+        return None
+    if not isinstance(item_rule, Mapping) or not set(item_rule).issubset(ARRAY_ITEM_KEYS):
+        return None
+    if item_rule.get("type") not in ARRAY_ITEM_TYPES:
+        return None
+    return item_rule
+
+
+def _as_array(value, item_type):
+    if isinstance(value, NumericSequence):
+        return value.array
+    if len(value) < MIN_COMPACT_LENGTH:
+        return None
+    dtype = _numeric_dtype(value)
+    # Lists mixing integers and floats cannot be checked against the int
+    # type once converted to a float array.
+    if dtype is None or (item_type == "int" and dtype == np.float64):
+        return None
+    try:
+        return np.asarray(value, dtype=dtype)
+    except OverflowError:
+        return None
+
+
+def check_numeric_array(array, item_rule, path):
+    """
+     Check all the values of a one-dimensional numeric array against the rule
+     of the items of a sequence. Returns pykwalify error entries, with the same
+     messages as pykwalify, for the offending indices only.
+    """
+    errors = []
+
+    enum = item_rule.get("enum")
+    if enum is not None:
+        enum_values = [value for value in enum if isinstance(value, Real)]
+        for index in np.flatnonzero(~np.isin(array, enum_values)):
+            errors.append(SchemaError.SchemaErrorEntry(
+                msg=u"Enum '{value}' does not exist. Path: '{path}' Enum: {enum_values}",
+                path="{}/{}".format(path, index),
+                value=array[index].item(),
+                enum_values=enum))
+
+    scalar_type = item_rule["type"]
+    if scalar_type == "int" and array.dtype.kind == "f":
+        for index in range(len(array)):
+            errors.append(SchemaError.SchemaErrorEntry(
+                msg=u"Value '{value}' is not of type '{scalar_type}'. Path: '{path}'",
+                path="{}/{}".format(path, index),
+                value=array[index].item(),
+                scalar_type=scalar_type))
+        return errors
+
+    range_ = item_rule.get("range")
+    if range_ is not None:
+        checks = [("max", "max_", np.less, "greater than max limit"),
+                  ("min", "min_", np.greater, "less than min limit"),
+                  ("max-ex", "max_ex", np.less_equal, "greater than or equals to max limit(exclusive)"),
+                  ("min-ex", "min_ex", np.greater_equal, "less than or equals to min limit(exclusive)")]
+        for bound_name, bound_key, compare, description in checks:
+            bound = range_.get(bound_name)
+            if bound is None:
+                continue
+            msg = u"Type '{prefix}' has size of '{value}', %s '{%s}'. Path: '{path}'" % (description, bound_key)
+            for index in np.flatnonzero(compare(bound, array)):
+                errors.append(SchemaError.SchemaErrorEntry(
+                    msg=msg,
+                    path="{}/{}".format(path, index),
+                    value=array[index].item(),
+                    prefix="scalar",
+                    **{bound_key: bound}))
+
+    return errors
+
+
+def _prepare(data, rule, path, errors):
+    if isinstance(data, Mapping):
+        return {key: _prepare(value, _child_rule(rule, key), "{}/{}".format(path, key), errors)
+                for key, value in data.items()}
+
+    if isinstance(data, (list, NumericSequence)):
+        item_rule = _array_item_rule(rule)
+        if item_rule is not None:
+            array = _as_array(data, item_rule["type"])
+            if array is not None:
+                errors.extend(check_numeric_array(array, item_rule, path))
+                return []
+        if isinstance(data, NumericSequence):
+            return data.tolist()
+        item_rule = _item_rule(rule)
+        return [_prepare(value, item_rule, "{}/{}".format(path, index), errors)
+                for index, value in enumerate(data)]
+
+    return data
+
+
+def prepare_source_data(data, schema_data):
+    """
+     Return a copy of data that can be validated by pykwalify against schema_data,
+     along with the errors found in the homogeneous numeric sequences that have
+     been checked as whole arrays. These sequences are replaced by empty lists
+     in the returned data so that pykwalify does not visit their items.
+     NumericSequence objects that cannot be checked this way are expanded to
+     plain lists.
+    """
+    errors = []
+    return _prepare(data, schema_data, "", errors), errors
+
+
+class ConfigCore(Core):
+    """
+     pykwalify Core checking homogeneous numeric sequences with NumPy
+     before validating the rest of the data.
+    """
+
+    def __init__(self, source_data, schema_data, **kwargs):
+        source_data, self.array_errors = prepare_source_data(source_data, schema_data)
+        super().__init__(source_data=source_data, schema_data=schema_data, **kwargs)
+
+    def _start_validate(self, value=None):
+        super()._start_validate(value)
+        self.errors.extend(self.array_errors)
+
+
+def _any_rule(rule):
+    # Rule accepting any value, keeping whether the value is required.
+    required = isinstance(rule, Mapping) and bool(rule.get("required", rule.get("req", False)))
+    return {"type": "any", "required": True} if required else {"type": "any"}
+
+
+def _shallow_rule(rule):
+    # Rule checking the constraints of a node on its direct children (e.g.,
+    # required keys, undefined keys, matching-rule) without visiting them.
+    # Returns None if such a rule cannot be built.
+    if not isinstance(rule, Mapping) or "include" in rule:
+        return None
+    for mapping_key in ("mapping", "map"):
+        if isinstance(rule.get(mapping_key), Mapping):
+            return dict(rule, **{mapping_key: {key: _any_rule(child)
+                                               for key, child in rule[mapping_key].items()}})
+    for sequence_key in ("sequence", "seq"):
+        if sequence_key in rule:
+            item_rule = _item_rule(rule)
+            if item_rule is None or not set(rule).issubset(ARRAY_SEQUENCE_KEYS | {"range"}) \
+                    or (isinstance(item_rule, Mapping) and "unique" in item_rule):
+                return None
+            return dict(rule, **{sequence_key: [{"type": "any"}]})
+    return rule
+
+
+def _stand_in(node):
+    # Node with the same keys (or length) as node, checked against shallow rules
+    # instead of node so that its subtrees are neither copied nor visited. None
+    # values are kept since pykwalify reports them for required keys.
+    if isinstance(node, Mapping):
+        return {key: None if value is None else 0 for key, value in node.items()}
+    if isinstance(node, (list, NumericSequence)):
+        return [0] * len(node)
+    return node
+
+
+def _validate_node(value, rule, path):
+    # pykwalify cannot validate None as root data, so the value is wrapped.
+    core = ConfigCore(source_data={"_": value},
+                      schema_data={"type": "map", "mapping": {"_": rule}})
+    core.validate(raise_exception=False)
+    prefix = "".join("/{}".format(key) for key in path)
+    for error in core.errors:
+        error.path = prefix + error.path[2:] if error.path.startswith("/_") else prefix + error.path
+    return core.errors
+
+
+def validate_paths(data, schema_data, paths):
+    """
+     Validate data against schema_data, assuming that it was valid before the
+     nodes at paths were modified (or deleted). Only the subtrees at paths are
+     fully validated; the nodes along the paths are only checked against the
+     constraints they put on their direct children. Returns pykwalify error
+     entries, or None if the schema cannot be checked this way (e.g., it uses
+     partial schemas), in which case the whole data must be validated.
+    """
+    if any(isinstance(key, str) and key.startswith("schema;") for key in schema_data):
+        return None
+
+    errors = []
+    checked = set()
+    for path in paths:
+        path = tuple(path)
+        node = data
+        rule = schema_data
+        for depth in range(len(path) + 1):
+            if depth == len(path):
+                errors.extend(_validate_node(node, rule, path))
+                break
+
+            if path[:depth] not in checked:
+                checked.add(path[:depth])
+                shallow_rule = _shallow_rule(rule)
+                if shallow_rule is None:
+                    return None
+                errors.extend(_validate_node(_stand_in(node), shallow_rule, path[:depth]))
+
+            # Deleted nodes, keys not defined by the schema, and nodes of the wrong
+            # type have been reported (or accepted) by the checks of their parent.
+            key = path[depth]
+            if isinstance(node, Mapping) and key in node:
+                node = node[key]
+                rule = _child_rule(rule, key)
+            elif isinstance(node, (list, NumericSequence)):
+                try:
+                    node = node[int(key)]
+                except (IndexError, ValueError):
+                    break
+                rule = _item_rule(rule)
+            else:
+                break
+            if rule is None:
+                break
+    return errors